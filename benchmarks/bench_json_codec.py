@@ -0,0 +1,59 @@
+"""
+Benchmarks the available JSON codecs on large RPC payloads:
+a debug_traceTransaction response and an eth_estimateGas deploy request.
+
+Usage: python benchmarks/bench_json_codec.py
+"""
+
+import os
+import timeit
+from pathlib import Path
+
+from boa_zksync.codec import JSON_CODECS
+from boa_zksync.types import CONTRACT_DEPLOYER_ADDRESS, ZERO_ADDRESS, DeployTransaction
+
+TRACE_FILE = Path(__file__).parent.parent / "debug_traceTransaction-True.json"
+NUMBER = 50
+
+
+def _deploy_payload(bytecode_size=64 * 1024) -> dict:
+    bytecode = os.urandom(bytecode_size)
+    tx = DeployTransaction(
+        sender=ZERO_ADDRESS,
+        to=CONTRACT_DEPLOYER_ADDRESS,
+        gas=0,
+        gas_price=10**8,
+        max_priority_fee_per_gas=10**8,
+        nonce=1,
+        value=0,
+        calldata=os.urandom(100),
+        bytecode=bytecode,
+        bytecode_hash=os.urandom(32),
+        dependency_bytecodes=[],
+        dependency_bytecode_hashes=[],
+        chain_id=260,
+        paymaster_params=None,
+    )
+    return {
+        "jsonrpc": "2.0",
+        "method": "eth_estimateGas",
+        "params": [tx.get_estimate_tx()],
+        "id": 0,
+    }
+
+
+def main():
+    trace_bytes = TRACE_FILE.read_bytes()
+    deploy_payload = _deploy_payload()
+    print(f"trace: {len(trace_bytes)} bytes, {NUMBER} iterations")
+    print(f"{'codec':<8} {'trace loads':>12} {'deploy dumps':>13}")
+    for name, codec in JSON_CODECS.items():
+        loads = timeit.timeit(lambda: codec.loads(trace_bytes), number=NUMBER)
+        dumps = timeit.timeit(lambda: codec.dumps(deploy_payload), number=NUMBER)
+        print(
+            f"{name:<8} {loads / NUMBER * 1e3:>10.3f}ms {dumps / NUMBER * 1e3:>11.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
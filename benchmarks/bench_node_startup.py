@@ -0,0 +1,37 @@
+"""
+Benchmarks the time from starting an anvil-zksync node until it answers the
+first RPC request. Requires anvil-zksync to be installed.
+
+Usage: python benchmarks/bench_node_startup.py [runs]
+"""
+
+import statistics
+import sys
+import time
+
+from boa_zksync.node import AnvilZKsync
+
+RUNS = 10
+
+
+def time_to_first_rpc() -> float:
+    start = time.perf_counter()
+    node = AnvilZKsync()
+    node.fetch("eth_chainId", [])
+    elapsed = time.perf_counter() - start
+    node.stop()
+    return elapsed
+
+
+def main(runs: int):
+    times = [time_to_first_rpc() for _ in range(runs)]
+    print(
+        f"time to first RPC over {runs} runs: "
+        f"min {min(times) * 1000:.1f}ms, "
+        f"median {statistics.median(times) * 1000:.1f}ms, "
+        f"max {max(times) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
@@ -0,0 +1,46 @@
+"""
+Benchmarks the latency of small RPC calls to a local anvil-zksync node, over a
+`requests` session and over the keep-alive transport used by `AnvilZKsync`.
+Requires anvil-zksync to be installed.
+
+Usage: python benchmarks/bench_rpc_transport.py [calls]
+"""
+
+import statistics
+import sys
+import time
+
+from boa_zksync.node import AnvilZKsync
+from boa_zksync.rpc import ZksyncRPC
+
+CALLS = 2000
+
+
+def latencies(rpc: ZksyncRPC, calls: int) -> list[float]:
+    rpc.fetch("eth_blockNumber", [])  # open the connection
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        rpc.fetch("eth_blockNumber", [])
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main(calls: int):
+    node = AnvilZKsync()
+    try:
+        transports = {"requests session": ZksyncRPC(node._rpc_url), "keep-alive": node}
+        for name, rpc in transports.items():
+            times = latencies(rpc, calls)
+            print(
+                f"{name:<16} {calls} calls: "
+                f"median {statistics.median(times) * 1e6:.0f}us, "
+                f"p99 {statistics.quantiles(times, n=100)[-1] * 1e6:.0f}us, "
+                f"total {sum(times) * 1000:.0f}ms"
+            )
+    finally:
+        node.stop()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CALLS)
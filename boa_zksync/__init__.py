@@ -1,25 +1,61 @@
+from importlib import import_module
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+# boa is needed to register the `boa.set_zksync_*` functions below. The rest of
+# the package is only imported when it's first used, see `__getattr__`.
 import boa
 from boa import get_verifier
 from boa.verifiers import VerificationResult
 
-from boa_zksync.contract import ZksyncContract
-from boa_zksync.environment import ZksyncEnv
-from boa_zksync.node import AnvilZKsync
-from boa_zksync.verifiers import ZksyncExplorer
+if TYPE_CHECKING:
+    from boa_zksync.contract import ZksyncContract
+    from boa_zksync.pool import NodePool
+
+_LAZY_IMPORTS = {
+    "ZksyncContract": "boa_zksync.contract",
+    "ZksyncEnv": "boa_zksync.environment",
+    "AnvilZKsync": "boa_zksync.node",
+    "MockZksyncNode": "boa_zksync.mock_node",
+    "NodePool": "boa_zksync.pool",
+    "ZksyncExplorer": "boa_zksync.verifiers",
+}
+
+
+def __getattr__(name: str):
+    if (module := _LAZY_IMPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(import_module(module), name)
+    return value
 
 
 def set_zksync_env(url, explorer_url=None, nickname=None):
+    from boa_zksync.environment import ZksyncEnv
+    from boa_zksync.verifiers import ZksyncExplorer
+
     boa.set_verifier(ZksyncExplorer(explorer_url))
     return boa.set_env(ZksyncEnv.from_url(url, nickname=nickname))
 
 
-def set_zksync_test_env(node_args=(), nickname=None):
-    return boa.set_env(
-        ZksyncEnv(rpc=AnvilZKsync(node_args=node_args), nickname=nickname)
+def set_zksync_test_env(
+    node_args=(), nickname=None, pool: "NodePool" = None, state: str | Path = None
+):
+    from boa_zksync.environment import ZksyncEnv
+    from boa_zksync.node import AnvilZKsync
+
+    rpc = (
+        pool.acquire(node_args=node_args) if pool else AnvilZKsync(node_args=node_args)
     )
+    env = ZksyncEnv(rpc=rpc, nickname=nickname)
+    if state is not None:
+        # restore the node state and contracts saved with `ZksyncEnv.dump_state`
+        env.load_state(state)
+    return boa.set_env(env)
 
 
 def set_zksync_fork(url, nickname=None, *args, **kwargs):
+    from boa_zksync.environment import ZksyncEnv
+
     env = ZksyncEnv.from_url(url, nickname=nickname)
     env.fork(*args, **kwargs)
     return boa.set_env(env)
@@ -38,7 +74,7 @@ boa.set_zksync_fork = set_zksync_fork
 boa.set_zksync_browser_env = set_zksync_browser_env
 
 
-def verify(contract: ZksyncContract, verifier=None, **kwargs) -> VerificationResult:
+def verify(contract: "ZksyncContract", verifier=None, **kwargs) -> VerificationResult:
     verifier = verifier or get_verifier()
     return verifier.verify(
         address=contract.address,
@@ -47,3 +83,8 @@ def verify(contract: ZksyncContract, verifier=None, **kwargs) -> VerificationRes
         constructor_calldata=contract.constructor_calldata,
         **kwargs,
     )
+
+
+def verify_many(contracts: list["ZksyncContract"], verifier=None, **kwargs):
+    verifier = verifier or get_verifier()
+    return verifier.verify_many(contracts, **kwargs)
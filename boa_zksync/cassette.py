@@ -0,0 +1,193 @@
+"""
+Records the JSON-RPC traffic of an env into a cassette file, and replays it
+without a node or network access, e.g. to run tests against forks offline.
+"""
+
+import gzip
+import json
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional
+
+from boa.rpc import RPC, RPCError
+
+from boa_zksync.codec import get_json_codec
+
+CASSETTE_VERSION = 1
+CASSETTE_MODES = ("record", "replay", "passthrough")
+# the methods that don't change the node state, so they can be sent again
+_READ_ONLY_PREFIXES = (
+    "eth_get",
+    "eth_call",
+    "eth_estimateGas",
+    "eth_chainId",
+    "eth_blockNumber",
+    "eth_gasPrice",
+    "eth_maxPriorityFeePerGas",
+    "debug_trace",
+    "zks_",
+    "net_",
+    "web3_",
+)
+
+
+class CassetteMissError(LookupError):
+    pass
+
+
+class CassetteRPC(RPC):
+    """
+    Wraps an RPC to record its responses in a cassette, or to replay them.
+    Requests are keyed on the method and the normalized params. When the same
+    request is sent several times, e.g. `eth_blockNumber`, the responses are
+    replayed in the order they were recorded, and the last one is repeated.
+
+    Modes:
+    - "record": forward every request, and record all responses.
+    - "replay": serve every request from the cassette, a miss raises an error.
+    - "passthrough": serve from the cassette, and forward and record the misses.
+    """
+
+    def __init__(self, path: str | Path, rpc: Optional[RPC] = None, mode="replay"):
+        """
+        :param path: The cassette file, a gzipped JSON file.
+        :param rpc: The RPC to forward requests to. Not needed to replay.
+        :param mode: One of "record", "replay" or "passthrough".
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode {mode}, options: {CASSETTE_MODES}")
+        if rpc is None and mode != "replay":
+            raise ValueError(f"An RPC is needed to {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._rpc = rpc
+        self._interactions: dict[str, list[dict]] = (
+            {} if mode == "record" else _load(self.path)
+        )
+        self._positions: dict[str, int] = {}  # the next response of each request
+        self._lock = Lock()
+
+    @property
+    def identifier(self) -> str:
+        return f"cassette:{self.path}"
+
+    @property
+    def name(self) -> str:
+        return self._rpc.name if self._rpc is not None else self.identifier
+
+    def fetch(self, method: str, params: Any) -> Any:
+        (response,) = self._respond([(method, params)])
+        return _unwrap(response)
+
+    def fetch_multi(self, payloads: list[tuple[str, Any]]) -> list[Any]:
+        return [_unwrap(response) for response in self._respond(payloads)]
+
+    def wait_for_tx_receipt(self, tx_hash, timeout: float, poll_latency=0.25):
+        # recorded receipts are replayed without waiting between the polls
+        poll_latency = 0 if self.mode == "replay" else poll_latency
+        return super().wait_for_tx_receipt(tx_hash, timeout, poll_latency)
+
+    def save(self):
+        """Writes the recorded responses to the cassette file."""
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "interactions": self._interactions}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_bytes(gzip.compress(get_json_codec().dumps(data)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.mode != "replay":
+            self.save()
+
+    def _respond(self, payloads: list[tuple[str, Any]]) -> list[dict]:
+        keys = [_request_key(method, params) for method, params in payloads]
+        with self._lock:
+            responses = [
+                None if self.mode == "record" else self._replay(key) for key in keys
+            ]
+        missing = [i for i, response in enumerate(responses) if response is None]
+        with self._lock:
+            self.hits += len(payloads) - len(missing)
+            self.misses += len(missing)
+        if not missing:
+            return responses
+        if self.mode == "replay":
+            method, params = payloads[missing[0]]
+            raise CassetteMissError(f"{method} {params} is not in {self.path}")
+
+        forwarded = self._forward([payloads[i] for i in missing])
+        with self._lock:
+            for i, response in zip(missing, forwarded):
+                self._interactions.setdefault(keys[i], []).append(response)
+                self._positions[keys[i]] = len(self._interactions[keys[i]])
+                responses[i] = response
+        return responses
+
+    def _replay(self, key: str) -> Optional[dict]:
+        recorded = self._interactions.get(key)
+        if not recorded:
+            return None
+        position = self._positions.get(key, 0)
+        self._positions[key] = position + 1
+        return recorded[min(position, len(recorded) - 1)]
+
+    def _forward(self, payloads: list[tuple[str, Any]]) -> list[dict]:
+        # record errors too, they are raised again when replayed
+        if len(payloads) == 1:
+            method, params = payloads[0]
+            try:
+                return [{"result": self._rpc.fetch(method, params)}]
+            except RPCError as e:
+                return [{"error": _error_json(e)}]
+        try:
+            return [{"result": result} for result in self._rpc.fetch_multi(payloads)]
+        except RPCError as e:
+            if not all(
+                method.startswith(_READ_ONLY_PREFIXES) for method, _ in payloads
+            ):
+                # the other requests may have changed the state, don't send them again
+                return [{"error": _error_json(e)} for _ in payloads]
+            # find out which request failed
+            return [item for payload in payloads for item in self._forward([payload])]
+
+
+def _load(path: Path) -> dict[str, list[dict]]:
+    if not path.exists():
+        return {}
+    data = get_json_codec().loads(gzip.decompress(path.read_bytes()))
+    if data.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version in {path}")
+    return data["interactions"]
+
+
+def _request_key(method: str, params: Any) -> str:
+    normalized = json.dumps(_normalize(params), sort_keys=True, separators=(",", ":"))
+    return f"{method}:{normalized}"
+
+
+def _normalize(value: Any) -> Any:
+    # e.g. checksummed and lowercase addresses are the same request
+    if isinstance(value, str):
+        return value.lower() if value.startswith("0x") else value
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {_normalize(key): _normalize(item) for key, item in value.items()}
+    return value
+
+
+def _error_json(error: RPCError) -> dict:
+    # the message of an RPCError starts with the code, which is stored apart
+    message = str(error).removeprefix(f"{error.code}: ")
+    return {"message": message, "code": error.code}
+
+
+def _unwrap(response: dict) -> Any:
+    if "error" in response:
+        error = response["error"]
+        raise RPCError(error["message"], error["code"])
+    return response["result"]
@@ -0,0 +1,66 @@
+"""
+The JSON codec used to encode and decode all RPC payloads.
+By default, the fastest installed library is used (orjson, ujson, then stdlib json).
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None  # type: ignore
+
+
+@dataclass(frozen=True)
+class JSONCodec:
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes | str], Any]
+
+
+JSON_CODECS = {
+    "json": JSONCodec(
+        "json", lambda obj: json.dumps(obj, separators=(",", ":")).encode(), json.loads
+    )
+}
+if ujson is not None:
+    JSON_CODECS["ujson"] = JSONCodec(
+        "ujson", lambda obj: ujson.dumps(obj).encode(), ujson.loads
+    )
+if orjson is not None:
+    # keys may be str subclasses, e.g. addresses in state overrides
+    JSON_CODECS["orjson"] = JSONCodec(
+        "orjson",
+        lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+        orjson.loads,
+    )
+
+_codec = next(
+    JSON_CODECS[name] for name in ("orjson", "ujson", "json") if name in JSON_CODECS
+)
+
+
+def get_json_codec() -> JSONCodec:
+    return _codec
+
+
+def set_json_codec(name: str) -> JSONCodec:
+    """
+    Sets the JSON library used for all RPC payloads.
+    :param name: One of "orjson", "ujson" or "json". The library must be installed.
+    :return: The previous codec.
+    """
+    global _codec
+    if name not in JSON_CODECS:
+        raise ValueError(
+            f"JSON codec {name} is not available, options: {list(JSON_CODECS)}"
+        )
+    previous, _codec = _codec, JSON_CODECS[name]
+    return previous
@@ -1,6 +1,7 @@
 import json
 import re
 import subprocess
+from functools import lru_cache
 from os import path
 from pathlib import Path
 from shutil import which
@@ -40,6 +41,7 @@ def compile_zksync(
     )
 
 
+@lru_cache(maxsize=1)
 def _get_zkvyper_version():
     output = _run_zkvyper("--version")
     match = re.search(r"\b(v\d+\.\d+\.\d+\S*)", output)
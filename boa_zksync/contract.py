@@ -1,17 +1,25 @@
 import textwrap
+from collections import defaultdict
 from contextlib import contextmanager
+from copy import copy
 from typing import TYPE_CHECKING, Optional
 
 from boa import Env
-from boa.contracts.abi.abi_contract import ABIContract, ABIFunction
+from boa.contracts.abi.abi_contract import (
+    ABIContract,
+    ABIFunction,
+    ABIOverload,
+    _abi_from_json,
+)
 from boa.contracts.event_decoder import RawLogEntry
 from boa.contracts.vyper.vyper_contract import VyperContract
-from boa.rpc import to_bytes, to_int
+from boa.rpc import to_hex
 from boa.util.abi import Address
 from cached_property import cached_property
 from vyper.semantics.analysis.base import VarInfo
 from vyper.semantics.types import HashMapT
 from vyper.semantics.types.function import ContractFunctionT
+from vyper.utils import keccak256
 
 from boa_zksync.compile import compile_zksync_source
 from boa_zksync.compiler_utils import (
@@ -19,18 +27,56 @@ from boa_zksync.compiler_utils import (
     generate_source_for_arbitrary_stmt,
     generate_source_for_internal_fn,
 )
+from boa_zksync.events import EventIndex, get_event_index, to_raw_log_entry
+from boa_zksync.storage import get_slot, get_storage_slot, is_readable, read_storage
 from boa_zksync.types import ZksyncCompilerData
 
 if TYPE_CHECKING:
     from boa_zksync import ZksyncEnv
     from boa_zksync.deployer import ZksyncDeployer
 
+# balance given to the sender while calling internal functions
+_INTERNAL_CALL_BALANCE = 10**20
+
+
+class ContractABI:
+    """
+    The parts of a contract object that only depend on its ABI.
+    They are shared by all the contracts attached by the same deployer.
+    """
+
+    def __init__(self, contract_name: str, abi: list[dict]):
+        self.functions = [
+            ABIFunction(item, contract_name)
+            for item in abi
+            if item.get("type") == "function"
+        ]
+        self.events = [item for item in abi if item.get("type") == "event"]
+        self.overloads: dict[str, list[ABIFunction]] = defaultdict(list)
+        for function in self.functions:
+            # computed once here, and copied along with the bound functions
+            function.argument_types, function.return_type
+            self.overloads[function.name].append(function)
+        self.method_id_map = {fn.method_id: fn for fn in self.functions}
+        self.event_for = {
+            int.from_bytes(keccak256(_event_signature(event).encode()), "big"): event
+            for event in self.events
+        }
+
+
+def _event_signature(event_abi: dict) -> str:
+    types = ",".join(_abi_from_json(item) for item in event_abi["inputs"])
+    return f"{event_abi['name']}({types})"
+
 
 class ZksyncContract(ABIContract):
     """
     A contract deployed to the Zksync network.
     """
 
+    # contracts created with `attach` are registered in the env on first use
+    _registered = True
+
     def __init__(
         self,
         compiler_data: ZksyncCompilerData,
@@ -80,6 +126,85 @@ class ZksyncContract(ABIContract):
         )
         self.env.register_contract(address, self)
 
+    @classmethod
+    def attach(
+        cls,
+        compiler_data: ZksyncCompilerData,
+        contract_name: str,
+        contract_abi: ContractABI,
+        address: Address | str,
+        env: "ZksyncEnv" = None,
+        filename: str = None,
+    ) -> "ZksyncContract":
+        """
+        Creates a contract object for a deployed contract, without any RPC calls.
+        The functions are bound on first access, and the bytecode is only fetched
+        when needed.
+        :param compiler_data: The compiler output of the deployed contract.
+        :param contract_name: The name of the contract.
+        :param contract_abi: The ABI structures, shared with other attached contracts.
+        :param address: The address of the deployed contract.
+        :param env: The environment, by default the singleton.
+        :param filename: The file the contract was compiled from.
+        :return: The contract object.
+        """
+        from boa_zksync.environment import ZksyncEnv
+
+        env = Env.get_singleton() if env is None else env
+        assert isinstance(
+            env, ZksyncEnv
+        ), "ZksyncContract can only be attached in zkSync environments"
+        contract = cls.__new__(cls)
+        contract.__dict__.update(
+            compiler_data=compiler_data,
+            created_from=None,
+            env=env,
+            filename=filename,
+            contract_name=contract_name,
+            _abi=compiler_data.abi,
+            _functions=contract_abi.functions,
+            _events=contract_abi.events,
+            _address=Address(address),
+            _computation=None,
+            _contract_abi=contract_abi,
+            _registered=False,
+            # pre-fill the cached properties with the shared values
+            method_id_map=contract_abi.method_id_map,
+            event_for=contract_abi.event_for,
+        )
+        return contract
+
+    def __getattr__(self, name):
+        # only called for missing attributes: bind functions of attached contracts
+        contract_abi = self.__dict__.get("_contract_abi")
+        if contract_abi is None or name not in contract_abi.overloads:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        self._ensure_registered()
+        functions = [copy(function) for function in contract_abi.overloads[name]]
+        bound = ABIOverload.create(functions, self)
+        setattr(self, name, bound)
+        return bound
+
+    def _ensure_registered(self):
+        if not self._registered:
+            self._registered = True
+            self.env.register_contract(self._address, self)
+
+    @cached_property
+    def _bytecode(self) -> bytes:
+        # set by the ABIContract constructor, attached contracts fetch it lazily
+        return self.env.get_code(self._address)
+
+    def __repr__(self):
+        # unlike the ABIContract, don't fetch the bytecode of attached contracts
+        file_str = f" (file {self.filename})" if self.filename else ""
+        warn_str = ""
+        if "_bytecode" in self.__dict__ and not self._bytecode:
+            warn_str = " (WARNING: no bytecode at this address!)"
+        return f"<{self.contract_name} interface at {self.address}{warn_str}>{file_str}"
+
     def _run_init(self, *args, value=0, override_address=None, gas=None):
         self.constructor_calldata = (
             self._ctor.prepare_calldata(*args) if self._ctor else b""
@@ -107,6 +232,7 @@ class ZksyncContract(ABIContract):
         return ABIFunction(ctor_abi, contract_name=self.contract_name)
 
     def eval(self, code):
+        self._ensure_registered()
         return ZksyncEval(code, self)()
 
     @contextmanager
@@ -136,6 +262,8 @@ class ZksyncContract(ABIContract):
 
     @cached_property
     def _storage(self):
+        self._ensure_registered()
+
         def storage():
             return None
 
@@ -146,6 +274,8 @@ class ZksyncContract(ABIContract):
 
     @cached_property
     def internal(self):
+        self._ensure_registered()
+
         def internal():
             return None
 
@@ -154,7 +284,19 @@ class ZksyncContract(ABIContract):
                 setattr(internal, fn_name, ZksyncInternalFunction(fn, self))
         return internal
 
-    def get_logs(self):
+    def get_logs(self, from_block: int = None, to_block="latest", event=None, **kwargs):
+        """
+        Decodes the logs emitted by this contract.
+        :param from_block: The first block to get logs for. When not given,
+            the logs of the last transaction receipt are returned instead.
+        :param to_block: The last block to get logs for, or a block tag.
+        :param event: The name of the event to filter on.
+        :param kwargs: Additional arguments for `ZksyncEnv.fetch_logs`.
+        :return: The decoded logs.
+        """
+        if from_block is not None:
+            return list(self.iter_logs(from_block, to_block, event, **kwargs))
+
         receipt = self.env.last_receipt
         if not receipt:
             raise ValueError("No logs available")
@@ -166,18 +308,35 @@ class ZksyncContract(ABIContract):
                 f"the last called contract was {receipt_source}"
             )
 
-        c = self.vyper_contract
-        ret = []
-        for log in receipt["logs"]:
-            address = Address(log["address"])
-            if address != self.address:
-                continue
-            index = to_int(log["logIndex"])
-            topics = [to_int(topic) for topic in log["topics"]]
-            data = to_bytes(log["data"])
-            event = RawLogEntry(index, address.canonical_address, topics, data)
-            ret.append(c.decode_log(event))
-        return ret
+        return [
+            self.decode_log(to_raw_log_entry(log))
+            for log in receipt["logs"]
+            if Address(log["address"]) == self.address
+        ]
+
+    def iter_logs(self, from_block: int, to_block="latest", event=None, **kwargs):
+        """
+        Streams the decoded logs emitted by this contract in a block range.
+        See `get_logs` for the parameters.
+        """
+        topics = None
+        if event is not None:
+            if (topic := self.event_index.topics.get(event)) is None:
+                raise ValueError(f"Event {event} not found in the ABI of {self}")
+            topics = [to_hex(topic.to_bytes(32, "big"))]
+
+        logs = self.env.fetch_logs(
+            from_block, to_block, address=self.address, topics=topics, **kwargs
+        )
+        for log in logs:
+            yield self.decode_log(to_raw_log_entry(log))
+
+    @cached_property
+    def event_index(self) -> EventIndex:
+        return get_event_index(self.compiler_data.bytecode_hash, self.compiler_data.abi)
+
+    def decode_log(self, log_entry: RawLogEntry):
+        return self.event_index.decode(log_entry)
 
 
 class ZksyncBlueprint(ZksyncContract):
@@ -209,14 +368,28 @@ class _ZksyncInternal(ABIFunction):
 
     def __call__(self, *args, **kwargs):
         env = self.contract.env
-        balance_before = env.get_balance(env.eoa)
-        env.set_code(self.contract.address, self._override_bytecode)
-        env.set_balance(env.eoa, 10**20)
+        address, eoa = self.contract.address, env.eoa
+        if not self.is_mutable and env._rpc_has_state_override:
+            # view-style access: override the code for this call only
+            overrides = {
+                address: {"code": to_hex(self._override_bytecode)},
+                eoa: {"balance": to_hex(_INTERNAL_CALL_BALANCE)},
+            }
+            with env.state_override(overrides):
+                return super().__call__(*args, **kwargs)
+
+        balance_before = env.get_balance(eoa)
+        env.set_state(
+            code={address: self._override_bytecode},
+            balance={eoa: _INTERNAL_CALL_BALANCE},
+        )
         try:
             return super().__call__(*args, **kwargs)
         finally:
-            env.set_balance(env.eoa, balance_before)
-            env.set_code(self.contract.address, self.contract.compiler_data.bytecode)
+            env.set_state(
+                code={address: self.contract.compiler_data.bytecode},
+                balance={eoa: balance_before},
+            )
 
 
 class ZksyncInternalFunction(_ZksyncInternal):
@@ -268,7 +441,23 @@ class ZksyncInternalVariable(_ZksyncInternal):
         self.var_name = name
 
     def get(self, *args):
-        return self.__call__(*args)
+        if self._storage_slot is None:
+            return self.__call__(*args)
+        # read the value directly from storage, no need to swap the bytecode
+        slot, typ = get_slot(
+            self._storage_slot, self.var.typ, self._merge_kwargs(*args)
+        )
+        env, address = self.contract.env, self.contract.address
+        return read_storage(
+            lambda start, count: env.get_storage_words(address, start, count), slot, typ
+        )
+
+    @cached_property
+    def _storage_slot(self) -> Optional[int]:
+        """The slot of the variable, if it can be read directly from storage."""
+        if not is_readable(self.var.typ):
+            return None
+        return get_storage_slot(self.contract.compiler_data.layout, self.var_name)
 
     @cached_property
     def source_code(self):
@@ -1,31 +1,103 @@
+from collections import OrderedDict
 from functools import cached_property
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
-from boa import Env
+from boa import Env, interpret
 from boa.contracts.abi.abi_contract import ABIContractFactory
+from boa.interpret import get_module_fingerprint
 from boa.util.abi import Address
 from vyper.compiler import CompilerData
 from vyper.compiler.output import build_solc_json
+from vyper.compiler.settings import anchor_settings
 
-from boa_zksync.compile import compile_zksync, compile_zksync_source
-from boa_zksync.contract import ZksyncBlueprint, ZksyncContract
+from boa_zksync.compile import (
+    _get_zkvyper_version,
+    compile_zksync,
+    compile_zksync_source,
+)
+from boa_zksync.contract import ContractABI, ZksyncBlueprint, ZksyncContract
 from boa_zksync.types import ZksyncCompilerData
 
 if TYPE_CHECKING:
     from boa_zksync.environment import ZksyncEnv
 
 
+# the most recently used deployers, see `ZksyncDeployer.__new__`
+DEPLOYER_CACHE_SIZE = 256
+_deployers: OrderedDict[tuple, "ZksyncDeployer"] = OrderedDict()
+
+
 class ZksyncDeployer(ABIContractFactory):
+    def __new__(cls, compiler_data: CompilerData, filename=None, zkvyper_data=None):
+        """
+        Deployers are memoized per source code, compiler settings and zkvyper
+        version, so loading the same source again doesn't compile it again.
+        The integrity sum covers the source of the imported modules too.
+        """
+        if zkvyper_data is not None:
+            return super().__new__(cls)
+
+        key = (
+            cls,
+            str(filename),
+            compiler_data.integrity_sum,
+            repr(compiler_data.settings),
+            _get_zkvyper_version(),
+        )
+        if (deployer := _deployers.get(key)) is not None:
+            _deployers.move_to_end(key)
+            return deployer
+
+        deployer = _deployers[key] = super().__new__(cls)
+        if len(_deployers) > DEPLOYER_CACHE_SIZE:
+            _deployers.popitem(last=False)
+        return deployer
+
     def __init__(self, compiler_data: CompilerData, filename=None, zkvyper_data=None):
+        if "zkvyper_data" in self.__dict__:
+            return  # a memoized deployer, see `__new__`
+
         contract_name = Path(compiler_data.contract_path).stem
         if zkvyper_data is None:
-            zkvyper_data = self._compile(compiler_data, contract_name, filename)
+            zkvyper_data = self._compile_cached(compiler_data, contract_name, filename)
         self.zkvyper_data = zkvyper_data
         super().__init__(
             contract_name, self.zkvyper_data.abi, compiler_data.contract_path
         )
 
+    @classmethod
+    def _compile_cached(
+        cls, compiler_data: CompilerData, contract_name: str, filename: str
+    ) -> ZksyncCompilerData:
+        """
+        Compiles through boa's disk cache, when it's enabled (see `boa.set_cache_dir`).
+        The cache is shared by all processes, like pytest-xdist workers, so each
+        contract is only compiled once. Unlike the memoized deployers, the key
+        includes the source of the imported modules.
+        """
+        disk_cache = interpret._disk_cache
+        if disk_cache is None:
+            return cls._compile(compiler_data, contract_name, filename)
+
+        with anchor_settings(compiler_data.settings):
+            module_t = compiler_data.annotated_vyper_module._metadata["type"]
+        cache_key = str(
+            (
+                "zkvyper",
+                contract_name,
+                str(filename),
+                get_module_fingerprint(module_t),
+                repr(compiler_data.settings),
+                _get_zkvyper_version(),
+            )
+        )
+        data = disk_cache.caching_lookup(
+            cache_key,
+            lambda: cls._compile(compiler_data, contract_name, filename).as_json_dict(),
+        )
+        return ZksyncCompilerData.from_json_dict(data)
+
     @staticmethod
     def _compile(
         compiler_data: CompilerData,
@@ -58,8 +130,20 @@ class ZksyncDeployer(ABIContractFactory):
     def at(self, address: Address | str) -> ZksyncContract:
         """
         Create an ABI contract object for a deployed contract at `address`.
+        This makes no RPC calls, and the ABI structures are shared between all
+        the contracts attached by this deployer, so attaching many is cheap.
         """
-        return self.deploy(override_address=Address(address), skip_initcode=True)
+        return ZksyncContract.attach(
+            self.zkvyper_data,
+            self._name,
+            self.contract_abi,
+            address,
+            filename=self.filename,
+        )
+
+    @cached_property
+    def contract_abi(self) -> ContractABI:
+        return ContractABI(self._name, self.zkvyper_data.abi)
 
     def deploy_as_blueprint(
         self, contract_name: Optional[str] = None, **kwargs
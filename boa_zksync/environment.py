@@ -1,36 +1,64 @@
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from functools import cached_property
-from hashlib import sha256
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Any, Iterable, Optional, Type
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, Type
 
 from boa.contracts.abi.abi_contract import ABIContract, ABIContractFactory
 from boa.deployments import get_deployments_db
 from boa.environment import _AddressType
 from boa.interpret import json
 from boa.network import NetworkEnv, _EstimateGasFailed
-from boa.rpc import RPC, EthereumRPC, RPCError, to_hex, to_int
+from boa.rpc import RPC, EthereumRPC, RPCError, to_bytes, to_hex, to_int
 from boa.util.abi import Address
 from eth.exceptions import VMError
 from eth_account import Account
 from requests import HTTPError
 
+from boa_zksync.codec import get_json_codec
+from boa_zksync.contract import ContractABI, ZksyncBlueprint, ZksyncContract
 from boa_zksync.deployer import ZksyncDeployer
-from boa_zksync.node import AnvilZKsync
+from boa_zksync.events import to_raw_log_entry
+from boa_zksync.node import AnvilZKsync, node_config
+from boa_zksync.node_output import TxOutput
+from boa_zksync.rpc import ZksyncRPC
 from boa_zksync.types import (
     CONTRACT_DEPLOYER_ADDRESS,
     DEFAULT_SALT,
+    L2_BASE_TOKEN_ADDRESS,
     ZERO_ADDRESS,
     DeployTransaction,
+    ZksyncCompilerData,
     ZksyncComputation,
     ZksyncMessage,
+    hash_code,
 )
 
-with open(Path(__file__).parent / "IContractDeployer.json") as f:
-    CONTRACT_DEPLOYER = ABIContractFactory.from_abi_dict(
-        json.load(f), "ContractDeployer"
-    )
+if TYPE_CHECKING:
+    from boa_zksync.pool import NodePool
+
+
+@lru_cache(maxsize=1)
+def _load_contract_deployer() -> ABIContractFactory:
+    with open(Path(__file__).parent / "IContractDeployer.json") as f:
+        return ABIContractFactory.from_abi_dict(json.load(f), "ContractDeployer")
+
+
+def __getattr__(name: str):
+    # the ABI is only parsed when it's first needed, to speed up the import
+    if name == "CONTRACT_DEPLOYER":
+        return _load_contract_deployer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# balanceOf(uint256) of the L2BaseToken system contract
+_BALANCE_OF_SELECTOR = bytes.fromhex("9cc7f708")
+
+# the number of fork nodes each env keeps running, see `ZksyncEnv.fork_rpc`
+FORK_CACHE_SIZE = 4
 
 
 class ZksyncEnv(NetworkEnv):
@@ -46,12 +74,24 @@ class ZksyncEnv(NetworkEnv):
         self.evm = None  # not used in zkSync
         self.last_receipt: dict | None = None
         self._vm = None
+        self._unresolved_code: dict[Address, Any] = {}
+        # set to True to include system contract calls in call traces
+        self.keep_system_frames = False
+        # set to True to always request the full call tree when tracing calls
+        self.detailed_traces = False
+        self._state_override: dict | None = None
+        self._anchors: list[_AnchorFrame] = []
+        # the fork nodes by their config, the most recently used last, with the
+        # pool they were taken from, if any
+        self._forks: OrderedDict[tuple, tuple[AnvilZKsync, Optional["NodePool"]]] = (
+            OrderedDict()
+        )
 
     @cached_property
     def create(self):
         return next(
             func
-            for func in CONTRACT_DEPLOYER.functions
+            for func in _load_contract_deployer().functions
             if func.full_signature == "create(bytes32,bytes32,bytes)"
         )
 
@@ -59,11 +99,23 @@ class ZksyncEnv(NetworkEnv):
     def vm(self):
         if self._vm is None:
             self._vm = lambda: None
-            self._vm.state = _RPCState(self._rpc)
+            # only a local node is guaranteed not to change between our calls
+            cache = isinstance(self._rpc, AnvilZKsync)
+            self._vm.state = _RPCState(self._rpc, cache, self._snapshot_anchors)
         return self._vm
 
+    @property
+    def timestamp(self) -> int:
+        return self.vm.state.timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: int):
+        self.vm.state.timestamp = value
+
     def _reset_fork(self, block_identifier="latest"):
-        self._vm = None
+        # called after every transaction, and during initialization
+        if getattr(self, "_vm", None) is not None:
+            self._vm.state.invalidate()
         if (
             block_identifier == "latest"
             and isinstance(self._rpc, AnvilZKsync)
@@ -71,43 +123,212 @@ class ZksyncEnv(NetworkEnv):
         ):
             del self._rpc  # close the old rpc
             self._rpc = inner_rpc
+            self._vm = None
 
     def fork(
         self, url: str = None, reset_traces=True, block_identifier="safe", **kwargs
     ):
         if url:
-            return super().fork(url, reset_traces, block_identifier, **kwargs)
+            return self.fork_rpc(
+                ZksyncRPC(url), reset_traces, block_identifier, **kwargs
+            )
         return self.fork_rpc(self._rpc, reset_traces, block_identifier, **kwargs)
 
     def fork_rpc(
-        self, rpc: EthereumRPC, reset_traces=True, block_identifier="safe", **kwargs
+        self,
+        rpc: EthereumRPC,
+        reset_traces=True,
+        block_identifier="safe",
+        pool: "NodePool" = None,
+        reuse: Optional[bool] = None,
+        **kwargs,
     ):
         """
         Fork the environment to a local chain.
+        The last `FORK_CACHE_SIZE` fork nodes are kept running. Forking the same
+        RPC at the same block number again switches back to its node right away,
+        with the changes made in that fork.
         :param rpc: RPC to fork from
         :param reset_traces: Reset the traces
         :param block_identifier: Block identifier to fork from
+        :param pool: The node pool to take the fork node from, if any. The node
+            is released to the pool again when it's replaced or evicted.
+        :param reuse: Switch to a running node of the same fork, if any.
+            Otherwise, a new node is started and replaces it. By default, only
+            nodes forked at a block number are reused, since tags like "safe"
+            refer to a newer block every time.
         :param kwargs: Additional arguments for the RPC
         """
         self._reset_fork(block_identifier)
         if reset_traces:
             self.sha3_trace: dict = {}
             self.sstore_trace: dict = {}
-        self._rpc = AnvilZKsync(rpc, block_identifier, **kwargs)
+        node_args = kwargs.get("node_args", ())
+        rpc_cache = kwargs.get("rpc_cache") or False
+        key = (*node_config(rpc._rpc_url, block_identifier, node_args), rpc_cache)
+        if reuse is None:
+            reuse = isinstance(block_identifier, int)
+        node, node_pool = self._forks.pop(key, (None, None))
+        if node is not None and not reuse:
+            _stop_fork(node, node_pool)
+            node = None
+        if node is None and (pool is None or rpc_cache):
+            # the nodes of a pool don't fork through the RPC cache
+            node, node_pool = AnvilZKsync(rpc, block_identifier, **kwargs), None
+        elif node is None:
+            node, node_pool = pool.acquire(rpc, block_identifier, node_args), pool
+        self._forks[key] = node, node_pool
+        self._rpc = node
+        while len(self._forks) > FORK_CACHE_SIZE:
+            _, evicted = self._forks.popitem(last=False)
+            _stop_fork(*evicted)
+        self._vm = None
+        self.__dict__.pop("_rpc_has_state_override", None)  # probe the new node
 
     def register_contract(self, address, obj):
         addr = Address(address)
-        self._contracts[addr.canonical_address] = obj
-        # also register it in the registry for
-        # create_minimal_proxy_to and create_copy_of
-        bytecode = self._rpc.fetch("eth_getCode", [address, "latest"])
-        self._code_registry[bytecode] = obj
+        self._register(self._contracts, addr.canonical_address, obj)
+        # also register it in the registry for create_minimal_proxy_to and
+        # create_copy_of. The registry is keyed by the zkSync bytecode hash, which
+        # we know from the zkSync compiler data. Other contracts, like the vyper
+        # contracts used to evaluate code, are resolved lazily.
+        compiler_data = getattr(obj, "compiler_data", None)
+        if isinstance(compiler_data, ZksyncCompilerData):
+            self._register(self._code_registry, compiler_data.bytecode_hash, obj)
+        else:
+            self._unresolved_code[addr] = obj
+
+    def register_blueprint(self, bytecode, obj):
+        self._register(self._code_registry, hash_code(bytecode), obj)
+
+    def _register(self, registry: dict, key, obj):
+        # keep the replaced entry, to restore it when the anchor is left
+        if self._anchors and (previous := registry.get(key)) is not None:
+            self._anchors[-1].replaced.append((registry, key, previous))
+        registry[key] = obj
+
+    def lookup_code(self, bytecode_hash: bytes):
+        """
+        Finds a registered contract by its zkSync bytecode hash.
+        :param bytecode_hash: The bytecode hash, see `hash_code`.
+        :return: The contract object, or None if no contract has that bytecode.
+        """
+        if self._unresolved_code:
+            addresses = list(self._unresolved_code)
+            bytecodes = self._rpc.fetch_multi(
+                [("eth_getCode", [address, "latest"]) for address in addresses]
+            )
+            for address, bytecode in zip(addresses, bytecodes):
+                if code := to_bytes(bytecode):
+                    self._register(
+                        self._code_registry,
+                        hash_code(code),
+                        self._unresolved_code[address],
+                    )
+            self._unresolved_code.clear()
+        return self._code_registry.get(bytecode_hash)
+
+    @cached_property
+    def _rpc_has_state_override(self) -> bool:
+        """
+        Checks whether the RPC applies state overrides to calls, by reading an
+        overridden balance from the L2BaseToken system contract. Calls are traced
+        with `debug_traceCall`, and only fall back to `eth_call` when tracing
+        fails, so the overrides are probed the same way.
+        """
+        balance = 0xB0A
+        calldata = _BALANCE_OF_SELECTOR + Address(ZERO_ADDRESS).canonical_address.rjust(
+            32, b"\0"
+        )
+        tx = {"to": L2_BASE_TOKEN_ADDRESS, "data": to_hex(calldata)}
+        overrides = {ZERO_ADDRESS: {"balance": to_hex(balance)}}
+        tracer = {
+            "tracer": "callTracer",
+            "tracerConfig": {"onlyTopCall": True},
+            "stateOverrides": overrides,
+        }
+        try:
+            trace = self._rpc.fetch("debug_traceCall", [tx, "latest", tracer])
+            output = trace.get("output") or "0x"
+        except (RPCError, HTTPError):
+            try:
+                output = self._rpc.fetch("eth_call", [tx, "latest", overrides])
+            except (RPCError, HTTPError):
+                return False
+        return to_int(output) == balance
+
+    @contextmanager
+    def state_override(self, overrides: dict):
+        """
+        Applies the given state overrides to the calls executed in this context,
+        without changing the chain state. Transactions are not affected.
+        :param overrides: The state override set, as accepted by `eth_call`,
+            e.g. `{address: {"code": "0x...", "balance": "0x..."}}`
+        """
+        if not self._rpc_has_state_override:
+            raise RuntimeError("RPC does not support state overrides!")
+        previous, self._state_override = self._state_override, overrides
+        try:
+            yield
+        finally:
+            self._state_override = previous
 
     @contextmanager
     def anchor(self):
-        snapshot_id = self._rpc.fetch("evm_snapshot", [])
-        yield
-        self._rpc.fetch("evm_revert", [snapshot_id])
+        """
+        Reverts the chain state, the last receipt and the contracts registered in
+        this env when the context exits, also when it raises.
+        The node snapshot is only taken before the first state change, and nested
+        anchors entered without changes in between share it. So anchors around
+        read-only code, like most of boa's per-test anchors, cost no RPC calls.
+        """
+        frame = _AnchorFrame(
+            rpc=self._rpc,
+            last_receipt=self.last_receipt,
+            contracts=len(self._contracts),
+            code_registry=len(self._code_registry),
+            unresolved_code=self._unresolved_code.copy(),
+        )
+        self._anchors.append(frame)
+        try:
+            yield
+        finally:
+            self._anchors.pop()
+            self._leave_anchor(frame)
+
+    def _snapshot_anchors(self):
+        """
+        Takes the node snapshot of the anchors entered since the last state change.
+        Called before every request that changes the state of the node.
+        """
+        pending = [
+            frame
+            for frame in self._anchors
+            if frame.snapshot_id is None and frame.rpc is self._rpc
+        ]
+        if pending:
+            snapshot_id = self._rpc.fetch("evm_snapshot", [])
+            for frame in pending:
+                frame.snapshot_id = snapshot_id
+
+    def _leave_anchor(self, frame: "_AnchorFrame"):
+        self.last_receipt = frame.last_receipt
+        for registry, key, previous in reversed(frame.replaced):
+            registry[key] = previous
+        for _, contract in _truncate(self._contracts, frame.contracts):
+            if "_registered" in vars(contract):
+                contract._registered = False  # attached before, register again
+        _truncate(self._code_registry, frame.code_registry)
+        self._unresolved_code = frame.unresolved_code
+
+        if frame.snapshot_id is None:
+            return  # nothing changed
+        frame.rpc.fetch("evm_revert", [frame.snapshot_id])
+        # the snapshot is used up, and the outer anchors sharing it are unchanged
+        for outer in self._anchors:
+            if outer.snapshot_id == frame.snapshot_id:
+                outer.snapshot_id = None
+        self.vm.state.invalidate()
 
     def execute_code(
         self,
@@ -119,6 +340,7 @@ class ZksyncEnv(NetworkEnv):
         is_modifying: bool = False,
         override_bytecode: bytes = None,
         contract: ABIContract = None,
+        simulate: bool = False,
     ) -> Any:
         """
         Executes a contract call in the zkSync network.
@@ -128,24 +350,28 @@ class ZksyncEnv(NetworkEnv):
         :param value: The amount of value to send with the transaction.
         :param data: The calldata for the contract function.
         :param contract: The contract ABI.
+        :param simulate: Whether to only call a modifying function, without a transaction.
         :return: The return value of the contract function.
         """
         sender = self._check_sender(self._get_sender(sender))
         args = ZksyncMessage(sender, to_address, gas or 0, value, data)
 
         try:
-            trace_call = self._rpc.fetch(
-                "debug_traceCall",
-                [args.as_json_dict(), "latest", {"tracer": "callTracer"}],
-            )
-            traced_computation = ZksyncComputation.from_call_trace(self, trace_call)
+            traced_computation = self._trace_call(args, full_tree=self.detailed_traces)
+            if traced_computation.is_error and not self.detailed_traces:
+                # the full call tree is needed to build the stack trace
+                traced_computation = self._trace_call(args, full_tree=True)
         except (RPCError, HTTPError):
-            output = self._rpc.fetch("eth_call", [args.as_json_dict(), "latest"])
+            params = [args.as_json_dict(), "latest"]
+            if self._state_override:
+                params.append(self._state_override)
+            output = self._rpc.fetch("eth_call", params)
             traced_computation = ZksyncComputation(
                 self, args, bytes.fromhex(output.removeprefix("0x"))
             )
 
-        if is_modifying:
+        if is_modifying and not simulate:
+            self._snapshot_anchors()
             try:
                 tx_data, receipt, trace = self._send_txn(**args.as_tx_params())
                 self.last_receipt = receipt
@@ -153,16 +379,41 @@ class ZksyncEnv(NetworkEnv):
                     assert (
                         traced_computation.is_error == trace.is_error
                     ), f"VMError mismatch: {traced_computation.error} != {trace.error}"
-                    return ZksyncComputation.from_debug_trace(self, trace.raw_trace)
+                    return ZksyncComputation.from_debug_trace(
+                        self, trace.raw_trace, self.keep_system_frames
+                    )
 
             except _EstimateGasFailed:
                 if not traced_computation.is_error:  # trace gives more information
                     return ZksyncComputation(
                         self, args, error=VMError("Estimate gas failed")
                     )
+            finally:
+                # also when a mined transaction reverted, before boa resets the fork
+                self.vm.state.invalidate()
 
         return traced_computation
 
+    def _trace_call(self, args: ZksyncMessage, full_tree: bool) -> ZksyncComputation:
+        """
+        Traces a call with the callTracer.
+        :param args: The message to trace.
+        :param full_tree: Whether to request nested calls, or only the top call.
+        :return: The traced computation.
+        """
+        tracer = {
+            "tracer": "callTracer",
+            "tracerConfig": {"onlyTopCall": not full_tree},
+        }
+        if self._state_override:
+            tracer["stateOverrides"] = self._state_override
+        trace_call = self._rpc.fetch(
+            "debug_traceCall", [args.as_json_dict(), "latest", tracer]
+        )
+        return ZksyncComputation.from_call_trace(
+            self, trace_call, self.keep_system_frames
+        )
+
     def deploy(self, *args, **kwargs):
         raise NotImplementedError("Please use `deploy_code` instead")
 
@@ -211,7 +462,7 @@ class ZksyncEnv(NetworkEnv):
         )
         nonce, chain_id, gas_price = [int(i, 16) for i in rpc_data]
 
-        bytecode_hash = _hash_code(bytecode)
+        bytecode_hash = hash_code(bytecode)
         tx = DeployTransaction(
             sender=sender,
             to=CONTRACT_DEPLOYER_ADDRESS,
@@ -226,7 +477,7 @@ class ZksyncEnv(NetworkEnv):
             bytecode=bytecode,
             bytecode_hash=bytecode_hash,
             dependency_bytecodes=list(dependency_bytecodes),
-            dependency_bytecode_hashes=[_hash_code(bc) for bc in dependency_bytecodes],
+            dependency_bytecode_hashes=[hash_code(bc) for bc in dependency_bytecodes],
             chain_id=chain_id,
             paymaster_params=kwargs.pop("paymaster_params", None),
         )
@@ -240,9 +491,15 @@ class ZksyncEnv(NetworkEnv):
         broadcast_ts = time.time()
 
         # Why do we do this over using _send_txn?
-        tx_hash = self._rpc.fetch("eth_sendRawTransaction", ["0x" + raw_tx.hex()])
-        print(f"tx broadcasted: {tx_hash}")
-        receipt = self._rpc.wait_for_tx_receipt(tx_hash, self.tx_settings.poll_timeout)
+        self._snapshot_anchors()
+        try:
+            tx_hash = self._rpc.fetch("eth_sendRawTransaction", ["0x" + raw_tx.hex()])
+            print(f"tx broadcasted: {tx_hash}")
+            receipt = self._rpc.wait_for_tx_receipt(
+                tx_hash, self.tx_settings.poll_timeout
+            )
+        finally:
+            self.vm.state.invalidate()
         self.last_receipt = receipt
 
         print(f"{tx_hash} mined in block {receipt['blockHash']}!")
@@ -259,11 +516,251 @@ class ZksyncEnv(NetworkEnv):
 
         return create_address, bytecode
 
+    def decode_logs(self, receipt: dict = None) -> list:
+        """
+        Decodes all the logs in a receipt, for every registered contract.
+        :param receipt: The receipt, by default the last one.
+        :return: The decoded logs, or the raw log entries of unknown contracts.
+        """
+        receipt = receipt or self.last_receipt
+        if not receipt:
+            raise ValueError("No logs available")
+        ret = []
+        for log in receipt["logs"]:
+            log_entry = to_raw_log_entry(log)
+            contract = self._contracts.get(log_entry.address)
+            ret.append(contract.decode_log(log_entry) if contract else log_entry)
+        return ret
+
+    def get_tx_output(
+        self, tx_hash: str = None, timeout: float = 0.1
+    ) -> Optional[TxOutput]:
+        """
+        Gets what the local node printed while executing a transaction, e.g. the
+        calls with `--show-calls`, without requesting a trace.
+        :param tx_hash: The transaction hash, by default the one of the last receipt.
+        :param timeout: The seconds to wait for the node output.
+        :return: The parsed output, or None if it's not available, e.g. because the
+            RPC is not a local node.
+        """
+        if tx_hash is None:
+            if not self.last_receipt:
+                raise ValueError("No transaction available")
+            tx_hash = self.last_receipt["transactionHash"]
+        if not isinstance(self._rpc, AnvilZKsync):
+            return None
+        return self._rpc.output.get_tx(tx_hash, timeout)
+
+    def fetch_logs(
+        self,
+        from_block: int,
+        to_block: int | str = "latest",
+        address: Optional[Address] = None,
+        topics: Optional[list] = None,
+        chunk_size: int = 10_000,
+        max_workers: int = 4,
+    ) -> Iterator[dict]:
+        """
+        Fetches the logs in a block range. The range is split into chunks that are
+        fetched concurrently, and the logs are yielded in order. When the provider
+        rejects a chunk as too large, it is split in half and the chunk size shrinks.
+        :param from_block: The first block of the range.
+        :param to_block: The last block of the range (inclusive), or a block tag.
+        :param address: Only fetch the logs emitted by this address.
+        :param topics: The topics filter, as accepted by `eth_getLogs`.
+        :param chunk_size: The number of blocks requested at once.
+        :param max_workers: The number of concurrent requests.
+        :return: An iterator over the raw logs.
+        """
+        if not isinstance(to_block, int):
+            block = self._rpc.fetch("eth_getBlockByNumber", [to_block, False])
+            to_block = to_int(block["number"])
+        log_filter = {"address": address, "topics": topics}
+        limits = {"chunk_size": chunk_size}  # shared with the workers
+
+        def fetch_chunk(start: int, end: int) -> list[dict]:
+            params = {**log_filter, "fromBlock": to_hex(start), "toBlock": to_hex(end)}
+            try:
+                return self._rpc.fetch(
+                    "eth_getLogs", [{k: v for k, v in params.items() if v}]
+                )
+            except RPCError as e:
+                if start == end or not _is_range_too_large(e):
+                    raise
+            middle = (start + end) // 2
+            limits["chunk_size"] = min(limits["chunk_size"], middle - start + 1)
+            return fetch_chunk(start, middle) + fetch_chunk(middle + 1, end)
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            pending: deque = deque()
+            start = from_block
+            while start <= to_block:
+                end = min(start + limits["chunk_size"], to_block + 1) - 1
+                pending.append(executor.submit(fetch_chunk, start, end))
+                start = end + 1
+                if len(pending) > max_workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def prefetch(
+        self,
+        addresses: Iterable[_AddressType] = (),
+        slots: dict[_AddressType, Iterable[int]] = None,
+        max_workers: int = 8,
+        batch_size: int = 16,
+    ) -> "PrefetchStats":
+        """
+        Warms a fork by reading the code, balance and nonce of the given accounts,
+        and the given storage slots, so the node fetches them from the upstream RPC
+        before they are needed. The reads are sent in batches, concurrently.
+        :param addresses: The accounts to read.
+        :param slots: The storage slots to read, by address.
+        :param max_workers: The number of concurrent requests.
+        :param batch_size: The number of reads per request.
+        :return: The number of reads, and the time they took.
+        """
+        slots = {
+            Address(address): list(items) for address, items in (slots or {}).items()
+        }
+        accounts = list(dict.fromkeys([*map(Address, addresses), *slots]))
+        reads = [
+            (method, [address, "latest"])
+            for address in accounts
+            for method in ("eth_getCode", "eth_getBalance", "eth_getTransactionCount")
+        ] + [
+            ("eth_getStorageAt", [address, to_hex(slot), "latest"])
+            for address, items in slots.items()
+            for slot in items
+        ]
+        batches = [reads[i : i + batch_size] for i in range(0, len(reads), batch_size)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers) as executor:
+            for _ in executor.map(self._rpc.fetch_multi, batches):
+                pass  # raises the first error
+        return PrefetchStats(
+            accounts=len(accounts),
+            slots=sum(len(items) for items in slots.values()),
+            requests=len(batches),
+            seconds=time.perf_counter() - start,
+        )
+
     def get_code(self, address: Address) -> bytes:
         return self._rpc.fetch("eth_getCode", [address, "latest"])
 
+    def get_storage(self, address: Address, slot: int) -> int:
+        return to_int(
+            self._rpc.fetch("eth_getStorageAt", [address, to_hex(slot), "latest"])
+        )
+
+    def get_storage_words(self, address: Address, slot: int, count: int) -> bytes:
+        """
+        Reads consecutive storage slots in a single JSON-RPC batch.
+        :param address: The address of the contract.
+        :param slot: The first slot to read.
+        :param count: The number of slots to read.
+        :return: The concatenated 32-byte storage words.
+        """
+        words = self._rpc.fetch_multi(
+            [
+                ("eth_getStorageAt", [address, to_hex(slot + i), "latest"])
+                for i in range(count)
+            ]
+        )
+        return b"".join(to_int(word).to_bytes(32, "big") for word in words)
+
     def set_code(self, address: Address, bytecode: bytes):
-        return self._rpc.fetch("hardhat_setCode", [address, f"0x{bytecode.hex()}"])
+        self._snapshot_anchors()
+        self._rpc.fetch("hardhat_setCode", [address, f"0x{bytecode.hex()}"])
+        self.vm.state.invalidate()
+
+    def set_state(
+        self, code: dict[Address, bytes] = None, balance: dict[Address, int] = None
+    ):
+        """
+        Sets the code and balance of multiple addresses in a single JSON-RPC batch.
+        :param code: Mapping of addresses to their new bytecode.
+        :param balance: Mapping of addresses to their new balance.
+        """
+        payloads = [
+            ("hardhat_setCode", [address, to_hex(bytecode)])
+            for address, bytecode in (code or {}).items()
+        ] + [
+            ("hardhat_setBalance", [address, to_hex(value)])
+            for address, value in (balance or {}).items()
+        ]
+        if payloads:
+            self._snapshot_anchors()
+            self._rpc.fetch_multi(payloads)
+            self.vm.state.invalidate()
+
+    def dump_state(self, path: str | Path):
+        """
+        Saves the state of the node and the contracts registered in this env, so
+        they can be restored in a new node with `load_state`, without deploying.
+        Contracts without zkSync compiler data are not saved.
+        :param path: The file to write the state to.
+        """
+        compiler_data, contracts = {}, []
+        for contract in self._contracts.values():
+            if not isinstance(contract, ZksyncContract):
+                continue
+            bytecode_hash = to_hex(contract.compiler_data.bytecode_hash)
+            if bytecode_hash not in compiler_data:
+                compiler_data[bytecode_hash] = contract.compiler_data.as_json_dict()
+            contracts.append(
+                {
+                    "address": str(contract.address),
+                    "contract_name": contract.contract_name,
+                    "filename": contract.filename,
+                    "blueprint": isinstance(contract, ZksyncBlueprint),
+                    "bytecode_hash": bytecode_hash,
+                }
+            )
+        state = {
+            "node_state": self._rpc.fetch("anvil_dumpState", []),
+            "compiler_data": compiler_data,
+            "contracts": contracts,
+        }
+        Path(path).write_bytes(get_json_codec().dumps(state))
+
+    def load_state(self, path: str | Path) -> list[ZksyncContract]:
+        """
+        Loads the node state and the contracts saved with `dump_state`.
+        :param path: The file to read the state from.
+        :return: The restored contracts, in the order they were registered.
+        """
+        state = get_json_codec().loads(Path(path).read_bytes())
+        self._snapshot_anchors()
+        if not self._rpc.fetch("anvil_loadState", [state["node_state"]]):
+            raise ValueError(f"The node could not load the state from {path}")
+        self.vm.state.invalidate()
+
+        compiler_data = {
+            bytecode_hash: ZksyncCompilerData.from_json_dict(data)
+            for bytecode_hash, data in state["compiler_data"].items()
+        }
+        contract_abis: dict[tuple, ContractABI] = {}
+        contracts = []
+        for item in state["contracts"]:
+            data, name = compiler_data[item["bytecode_hash"]], item["contract_name"]
+            if (contract_abi := contract_abis.get((data.bytecode_hash, name))) is None:
+                contract_abi = contract_abis[data.bytecode_hash, name] = ContractABI(
+                    name, data.abi
+                )
+            contract_class = ZksyncBlueprint if item["blueprint"] else ZksyncContract
+            contract = contract_class.attach(
+                data,
+                name,
+                contract_abi,
+                item["address"],
+                env=self,
+                filename=item["filename"],
+            )
+            contract._ensure_registered()
+            contracts.append(contract)
+        return contracts
 
     def generate_address(self, alias: Optional[str] = None) -> _AddressType:
         """
@@ -284,33 +781,76 @@ class ZksyncEnv(NetworkEnv):
         return address
 
     def get_balance(self, addr: Address):
-        balance = self._rpc.fetch("eth_getBalance", [addr, "latest"])
-        return to_int(balance)
+        return self.vm.state.get_balance(Address(addr))
 
     def set_balance(self, addr: Address, value: int):
+        self._snapshot_anchors()
         self._rpc.fetch("hardhat_setBalance", [addr, to_hex(value)])
+        self.vm.state.invalidate()
 
     # Override
     @classmethod
     def from_url(cls, url: str, nickname=None) -> "NetworkEnv":
-        return cls(EthereumRPC(url), nickname=nickname)
+        return cls(ZksyncRPC(url), nickname=nickname)
+
+
+@dataclass
+class PrefetchStats:
+    accounts: int
+    slots: int
+    # the number of batch requests that were sent
+    requests: int
+    seconds: float
+
+    @property
+    def reads_per_second(self) -> float:
+        reads = self.accounts * 3 + self.slots
+        return reads / self.seconds if self.seconds else float("inf")
+
+
+@dataclass
+class _AnchorFrame:
+    """The state to restore when leaving an anchor."""
 
+    rpc: RPC
+    last_receipt: Optional[dict]
+    # the sizes of the registries, entries added later are removed
+    contracts: int
+    code_registry: int
+    unresolved_code: dict
+    # the (registry, key, value) entries overwritten inside the anchor
+    replaced: list[tuple[dict, Any, Any]] = field(default_factory=list)
+    # taken before the first state change, None while there are no changes
+    snapshot_id: Optional[str] = None
 
-def _hash_code(bytecode: bytes) -> bytes:
+
+def _stop_fork(node: AnvilZKsync, pool: Optional["NodePool"]):
+    """Returns a fork node to the pool it was taken from, or stops it."""
+    if pool is not None:
+        pool.release(node)
+    else:
+        node.stop()
+
+
+def _truncate(registry: dict, size: int) -> list[tuple]:
+    """Removes the entries added after the registry had the given size."""
+    return [registry.popitem() for _ in range(len(registry) - size)]
+
+
+def _is_range_too_large(error: RPCError) -> bool:
     """
-    Hashes the bytecode for contract deployment, according to the zkSync spec.
-    Based on https://github.com/zksync-sdk/zksync2-python/blob/d33eff9/zksync2/core/utils.py#L45
+    Checks whether the provider rejected a log query because it spans too many
+    blocks or returns too many results. There is no standard error for this.
     """
-    bytecode_len = len(bytecode)
-    bytecode_size = int(bytecode_len / 32)
-    assert bytecode_len % 32 == 0, "Bytecode length must be a multiple of 32 bytes"
-    assert bytecode_size < 2**16, "Bytecode length must be less than 2^16"
-    bytecode_hash = sha256(bytecode).digest()
-    return b"\x01\00" + bytecode_size.to_bytes(2, byteorder="big") + bytecode_hash[4:]
+    message = str(error).lower()
+    return error.code == -32005 or any(
+        reason in message
+        for reason in ("too many", "too large", "too wide", "limit", "exceed")
+    )
 
 
 class _RPCProperty:
-    def __init__(self, getter, setter):
+    def __init__(self, getter, setter=None):
         self.getter = getter
         self.setter = setter
 
@@ -321,22 +861,63 @@ class _RPCProperty:
     def __get__(self, state: "_RPCState", owner):
         if state is None:
             return self  # static call
-        return self.getter(state.rpc)
+        return self.getter(state)
 
     def __set__(self, state: "_RPCState", value):
-        self.setter(state.rpc, value)
+        if self.setter is None:
+            raise AttributeError("Property is read-only")
+        state.before_change()
+        self.setter(state, value)
+        state.invalidate()
 
 
 class _RPCState:
+    """
+    A block-scoped view of the chain state. With `cache` enabled (when we are the
+    only ones producing blocks), values are kept until `invalidate` is called,
+    i.e. when a transaction is sent, the time is set or a snapshot is reverted.
+    """
+
     # Test node adds a virtual empty block at the end of the batch.
     # When you use the RPC - you get the timestamp of the last actually committed block.
     timestamp = _RPCProperty(
-        lambda rpc: to_int(
-            rpc.fetch_uncached("eth_getBlockByNumber", ["pending", False])["timestamp"]
-        )
-        + 1,
-        lambda rpc, value: rpc.fetch_uncached("evm_setTime", [value - 1]),
+        lambda state: to_int(state.pending_block["timestamp"]) + 1,
+        lambda state, value: state.rpc.fetch_uncached("evm_setTime", [value - 1]),
     )
+    block_number = _RPCProperty(lambda state: to_int(state.pending_block["number"]) + 1)
+    base_fee = _RPCProperty(lambda state: to_int(state.pending_block["baseFeePerGas"]))
 
-    def __init__(self, rpc):
+    def __init__(self, rpc, cache=False, before_change: Callable[[], None] = None):
         self.rpc = rpc
+        self.cache = cache
+        # called before the state is changed, e.g. to snapshot the env anchors
+        self.before_change = before_change or (lambda: None)
+        self.hits = 0  # number of RPC calls saved by the cache
+        self.misses = 0
+        self._block: dict | None = None
+        self._balances: dict[Address, int] = {}
+
+    def invalidate(self):
+        self._block = None
+        self._balances.clear()
+
+    @property
+    def pending_block(self) -> dict:
+        if self._block is not None:
+            self.hits += 1
+            return self._block
+        self.misses += 1
+        block = self.rpc.fetch_uncached("eth_getBlockByNumber", ["pending", False])
+        if self.cache:
+            self._block = block
+        return block
+
+    def get_balance(self, address: Address) -> int:
+        if (balance := self._balances.get(address)) is not None:
+            self.hits += 1
+            return balance
+        self.misses += 1
+        balance = to_int(self.rpc.fetch_uncached("eth_getBalance", [address, "latest"]))
+        if self.cache:
+            self._balances[address] = balance
+        return balance
@@ -0,0 +1,110 @@
+"""
+Decodes events from the contract ABI alone, without compiling any Vyper code.
+The event index of a contract is built once, and shared between all contracts
+with the same bytecode.
+"""
+
+from collections import OrderedDict, namedtuple
+from typing import NamedTuple
+
+from boa.contracts.abi.abi_contract import (
+    _abi_from_json,
+    _format_abi_type,
+    _parse_complex,
+)
+from boa.contracts.event_decoder import RawLogEntry
+from boa.rpc import to_bytes, to_int
+from boa.util.abi import Address, abi_decode
+from vyper.utils import keccak256
+
+
+class _EventDecoder:
+    """Decodes a single event, the schemas are computed upfront."""
+
+    def __init__(self, event_abi: dict):
+        self.inputs = event_abi["inputs"]
+        # indexed dynamic values are stored as the hash of their encoding
+        self.topic_types = [
+            "bytes32" if _is_dynamic(item) else _abi_from_json(item)
+            for item in self.inputs
+            if item["indexed"]
+        ]
+        self.data_schema = _format_abi_type(
+            [_abi_from_json(item) for item in self.inputs if not item["indexed"]]
+        )
+        # `address` is a reserved keyword in vyper and solidity, so it can't clash
+        field_names = ["address"] + [item["name"] for item in self.inputs]
+        self.tuple_type = namedtuple(  # type: ignore[misc]
+            event_abi["name"], field_names, rename=True
+        )
+
+    def decode(self, log_entry: RawLogEntry) -> NamedTuple:
+        topics = iter(
+            abi_decode(typ, topic.to_bytes(32, "big"))
+            for typ, topic in zip(self.topic_types, log_entry.topics[1:])
+        )
+        data = iter(abi_decode(self.data_schema, log_entry.data))
+        values = [Address(log_entry.address)]
+        for item in self.inputs:
+            values.append(
+                _parse_complex(item, next(topics if item["indexed"] else data))
+            )
+        return self.tuple_type(*values)
+
+
+class EventIndex:
+    """Maps the topic0 of each event in an ABI to its decoder."""
+
+    def __init__(self, abi: list[dict]):
+        self.decoders: dict[int, _EventDecoder] = {}
+        self.topics: dict[str, int] = {}
+        for item in abi:
+            if item.get("type") != "event" or item.get("anonymous"):
+                continue
+            types = ",".join(_abi_from_json(i) for i in item["inputs"])
+            topic = int.from_bytes(
+                keccak256(f"{item['name']}({types})".encode()), "big"
+            )
+            self.decoders[topic] = _EventDecoder(item)
+            self.topics[item["name"]] = topic
+
+    def decode(self, log_entry: RawLogEntry) -> NamedTuple:
+        decoder = self.decoders.get(log_entry.topics[0]) if log_entry.topics else None
+        if decoder is None:
+            topic = hex(log_entry.topics[0]) if log_entry.topics else None
+            raise ValueError(f"can't find event with hash {topic} in abi")
+        return decoder.decode(log_entry)
+
+
+# the event indexes of the most recently used bytecodes, see `get_event_index`
+EVENT_INDEX_CACHE_SIZE = 256
+_event_indexes: OrderedDict[bytes, EventIndex] = OrderedDict()
+
+
+def get_event_index(bytecode_hash: bytes, abi: list[dict]) -> EventIndex:
+    """
+    Gets the event index of a contract, building it the first time its bytecode is seen.
+    """
+    if (index := _event_indexes.get(bytecode_hash)) is not None:
+        _event_indexes.move_to_end(bytecode_hash)
+        return index
+
+    index = _event_indexes[bytecode_hash] = EventIndex(abi)
+    if len(_event_indexes) > EVENT_INDEX_CACHE_SIZE:
+        _event_indexes.popitem(last=False)
+    return index
+
+
+def to_raw_log_entry(log: dict) -> RawLogEntry:
+    """Converts a log from an RPC receipt to the format used by boa."""
+    return RawLogEntry(
+        to_int(log["logIndex"]),
+        Address(log["address"]).canonical_address,
+        [to_int(topic) for topic in log["topics"]],
+        to_bytes(log["data"]),
+    )
+
+
+def _is_dynamic(item: dict) -> bool:
+    typ = _abi_from_json(item)
+    return typ in ("string", "bytes") or typ.endswith("]") or typ.startswith("(")
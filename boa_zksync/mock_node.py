@@ -0,0 +1,319 @@
+"""
+An in-process stand-in for an anvil-zksync node, for unit tests that don't need
+to execute contracts. It keeps balances, nonces, code and storage, mines a block
+for every transaction, and supports snapshots. Contract code is not executed:
+calls return empty output, unless a result was scripted with `mock_call`.
+"""
+
+import copy
+import time
+from dataclasses import asdict, dataclass, field
+from threading import Lock
+from typing import Any, Callable, Optional
+
+import rlp
+from boa.rpc import RPC, RPCError, to_bytes, to_hex, to_int
+from eth_account import Account
+from eth_utils import keccak
+
+from boa_zksync.types import CONTRACT_DEPLOYER_ADDRESS, hash_code
+
+# the defaults of anvil-zksync
+CHAIN_ID = 260
+GAS_PRICE = 45_250_000
+# the gas reported by estimates and traces, nothing is metered
+GAS_ESTIMATE = 1_000_000
+GAS_USED = 21_000
+
+_CREATE_PREFIX = keccak(b"zksyncCreate")
+_CALL_REVERTED = 3  # the error code of reverted calls and gas estimates
+_METHOD_NOT_FOUND = -32601
+# code isn't executed, so overridden code or balances would be silently ignored
+_OVERRIDES_UNSUPPORTED = RPCError("State overrides are not supported", -32602)
+
+
+@dataclass
+class _ChainState:
+    balances: dict[str, int] = field(default_factory=dict)
+    nonces: dict[str, int] = field(default_factory=dict)
+    deploy_nonces: dict[str, int] = field(default_factory=dict)
+    code: dict[str, str] = field(default_factory=dict)
+    storage: dict[str, dict[str, str]] = field(default_factory=dict)  # by hex slot
+    receipts: dict[str, dict] = field(default_factory=dict)
+    traces: dict[str, dict] = field(default_factory=dict)
+    block_number: int = 0
+    timestamp: int = 0
+
+
+@dataclass
+class _MockCall:
+    to: str
+    data: bytes
+    output: bytes | Callable[[bytes], bytes]
+    revert: Optional[str]
+
+
+class MockZksyncNode(RPC):
+    """
+    Answers the JSON-RPC requests `ZksyncEnv` sends to a test node, in memory.
+    Transactions are applied without checking their signatures or gas.
+    """
+
+    def __init__(self, chain_id=CHAIN_ID, gas_price=GAS_PRICE):
+        """
+        :param chain_id: The chain id reported by the node.
+        :param gas_price: The gas price and base fee reported by the node.
+        """
+        self.chain_id = chain_id
+        self.gas_price = gas_price
+        self.state = _ChainState(timestamp=int(time.time()))
+        # the method and params of every request, e.g. to count them in tests
+        self.requests: list[tuple[str, Any]] = []
+        self._calls: list[_MockCall] = []
+        self._snapshots: list[_ChainState] = []
+        self._lock = Lock()
+
+    @property
+    def name(self) -> str:
+        return "mock-zksync"
+
+    @property
+    def methods(self) -> list[str]:
+        """The methods of the requests, in order."""
+        return [method for method, _ in self.requests]
+
+    def mock_call(
+        self,
+        to: str,
+        output: bytes | Callable[[bytes], bytes] = b"",
+        data: bytes = b"",
+        revert: Optional[str] = None,
+    ):
+        """
+        Scripts the result of calls and transactions to a contract.
+        The last matching script is used.
+        :param to: The address of the contract.
+        :param output: The returned bytes, or a function of the calldata returning them.
+        :param data: Only match calldata starting with these bytes, e.g. a selector.
+        :param revert: The revert reason, to make the call revert instead.
+        """
+        self._calls.append(_MockCall(to.lower(), data, output, revert))
+
+    def fetch(self, method: str, params: Any) -> Any:
+        with self._lock:
+            self.requests.append((method, params))
+            if (handler := getattr(self, f"_{method}", None)) is None:
+                raise RPCError(f"Method not found: {method}", _METHOD_NOT_FOUND)
+            return handler(*params)
+
+    def fetch_multi(self, payloads: list[tuple[str, Any]]) -> list[Any]:
+        return [self.fetch(method, params) for method, params in payloads]
+
+    # chain state
+
+    def _eth_chainId(self):
+        return to_hex(self.chain_id)
+
+    def _eth_gasPrice(self):
+        return to_hex(self.gas_price)
+
+    def _eth_maxPriorityFeePerGas(self):
+        return "0x0"
+
+    def _eth_blockNumber(self):
+        return to_hex(self.state.block_number)
+
+    def _eth_getBlockByNumber(self, block_identifier, full_transactions=False):
+        number = self.state.block_number
+        if block_identifier not in ("latest", "pending", "safe", "finalized"):
+            number = min(to_int(block_identifier), number)
+        return {
+            "number": to_hex(number),
+            "hash": to_hex(keccak(number.to_bytes(32, "big"))),
+            "timestamp": to_hex(self.state.timestamp),
+            "baseFeePerGas": to_hex(self.gas_price),
+            "transactions": [],
+        }
+
+    def _eth_getBalance(self, address, block_identifier="latest"):
+        return to_hex(self.state.balances.get(address.lower(), 0))
+
+    def _eth_getTransactionCount(self, address, block_identifier="latest"):
+        return to_hex(self.state.nonces.get(address.lower(), 0))
+
+    def _eth_getCode(self, address, block_identifier="latest"):
+        return self.state.code.get(address.lower(), "0x")
+
+    def _eth_getStorageAt(self, address, slot, block_identifier="latest"):
+        value = self.state.storage.get(address.lower(), {}).get(_slot(slot), "0x0")
+        return to_hex(to_int(value).to_bytes(32, "big"))
+
+    def _eth_getLogs(self, params):
+        return []  # contracts are not executed, so there are no logs
+
+    def _hardhat_setBalance(self, address, value):
+        self.state.balances[address.lower()] = to_int(value)
+        return True
+
+    def _hardhat_setCode(self, address, code):
+        self.state.code[address.lower()] = code
+        return True
+
+    def _hardhat_setStorageAt(self, address, slot, value):
+        self.state.storage.setdefault(address.lower(), {})[_slot(slot)] = value
+        return True
+
+    def _evm_setTime(self, timestamp):
+        # a number, or a hex string like other quantities
+        self.state.timestamp = (
+            timestamp if isinstance(timestamp, int) else to_int(timestamp)
+        )
+        return True
+
+    def _evm_mine(self, *params):
+        self._mine()
+        return "0x0"
+
+    def _evm_snapshot(self):
+        self._snapshots.append(copy.deepcopy(self.state))
+        return to_hex(len(self._snapshots) - 1)
+
+    def _evm_revert(self, snapshot_id):
+        index = to_int(snapshot_id)
+        if index >= len(self._snapshots):
+            return False
+        self.state = self._snapshots[index]
+        del self._snapshots[index:]
+        return True
+
+    def _anvil_dumpState(self):
+        return asdict(self.state)
+
+    def _anvil_loadState(self, state):
+        self.state = _ChainState(**copy.deepcopy(state))
+        return True
+
+    # calls
+
+    def _eth_call(self, tx, block_identifier="latest", state_override=None):
+        if state_override:
+            raise _OVERRIDES_UNSUPPORTED
+        frame = self._call_frame(tx)
+        if frame["revertReason"] is not None:
+            raise RPCError(
+                f"execution reverted: {frame['revertReason']}", _CALL_REVERTED
+            )
+        return frame["output"]
+
+    def _eth_estimateGas(self, tx, block_identifier="latest"):
+        self._eth_call(tx)
+        return to_hex(GAS_ESTIMATE)
+
+    def _debug_traceCall(self, tx, block_identifier="latest", tracer=None):
+        if (tracer or {}).get("stateOverrides"):
+            raise _OVERRIDES_UNSUPPORTED
+        return self._call_frame(tx)
+
+    def _debug_traceTransaction(self, tx_hash, tracer=None):
+        return self.state.traces.get(tx_hash)
+
+    def _call_frame(self, tx: dict) -> dict:
+        """The callTracer frame of a call, with the scripted result."""
+        to, data = tx.get("to") or "0x", to_bytes(tx.get("data") or "0x")
+        output, revert = b"", None
+        for call in reversed(self._calls):
+            if call.to == to.lower() and data.startswith(call.data):
+                output = call.output(data) if callable(call.output) else call.output
+                revert = call.revert
+                break
+        return {
+            "type": "Call",
+            "from": tx.get("from"),
+            "to": to,
+            "gas": to_hex(to_int(tx.get("gas") or "0x0")),
+            "gasUsed": to_hex(GAS_USED),
+            "value": to_hex(to_int(tx.get("value") or "0x0")),
+            "input": to_hex(data),
+            "output": to_hex(output),
+            "error": None if revert is None else "execution reverted",
+            "revertReason": revert,
+            "calls": [],
+        }
+
+    # transactions
+
+    def _eth_sendRawTransaction(self, raw_tx):
+        raw = to_bytes(raw_tx)
+        tx_hash = to_hex(keccak(raw))
+        if raw[0] == 0x71:  # zkSync EIP-712, the sender is part of the transaction
+            fields = rlp.decode(raw[1:])
+            nonce, to, value, data = fields[0], fields[4], fields[5], fields[6]
+            sender, factory_deps = to_hex(fields[11]), fields[13]
+        elif raw[0] == 0x02:
+            fields = rlp.decode(raw[1:])
+            nonce, to, value, data = fields[1], fields[5], fields[6], fields[7]
+            sender, factory_deps = Account.recover_transaction(raw), []
+        else:
+            raise RPCError(f"Unsupported transaction type {raw[0]}", -32602)
+
+        sender, nonce, value = sender.lower(), _to_int(nonce), _to_int(value)
+        if nonce != (expected := self.state.nonces.get(sender, 0)):
+            raise RPCError(f"Invalid nonce {nonce}, expected {expected}", -32000)
+        if value > (balance := self.state.balances.get(sender, 0)):
+            raise RPCError(f"Insufficient funds for transfer of {value}", -32000)
+
+        tx = {"from": sender, "to": to_hex(to), "value": to_hex(value), "data": data}
+        frame = self._call_frame({**tx, "data": to_hex(data)})
+        self.state.nonces[sender] = nonce + 1
+        contract_address = None
+        if frame["revertReason"] is None:
+            self.state.balances[sender] = balance - value
+            self.state.balances[tx["to"]] = self.state.balances.get(tx["to"], 0) + value
+            if tx["to"] == CONTRACT_DEPLOYER_ADDRESS:
+                contract_address = self._create(sender, data, factory_deps)
+        self._mine()
+        self.state.traces[tx_hash] = frame
+        self.state.receipts[tx_hash] = {
+            "transactionHash": tx_hash,
+            "blockNumber": to_hex(self.state.block_number),
+            "blockHash": self._eth_getBlockByNumber("latest")["hash"],
+            "from": sender,
+            "to": tx["to"],
+            "contractAddress": contract_address,
+            "status": "0x1" if frame["revertReason"] is None else "0x0",
+            "gasUsed": frame["gasUsed"],
+            "effectiveGasPrice": to_hex(self.gas_price),
+            "logs": [],
+        }
+        return tx_hash
+
+    def _eth_getTransactionReceipt(self, tx_hash):
+        return self.state.receipts.get(tx_hash)
+
+    def _create(self, sender: str, calldata: bytes, factory_deps: list[bytes]) -> str:
+        # calldata of `create(bytes32 salt, bytes32 bytecodeHash, bytes input)`
+        bytecode_hash = calldata[36:68]
+        code = next(dep for dep in factory_deps if hash_code(dep) == bytecode_hash)
+        deploy_nonce = self.state.deploy_nonces.get(sender, 0)
+        self.state.deploy_nonces[sender] = deploy_nonce + 1
+        address = to_hex(
+            keccak(
+                _CREATE_PREFIX
+                + to_bytes(sender).rjust(32, b"\0")
+                + deploy_nonce.to_bytes(32, "big")
+            )[12:]
+        )
+        self.state.code[address] = to_hex(code)
+        return address
+
+    def _mine(self):
+        self.state.block_number += 1
+        self.state.timestamp += 1
+
+
+def _to_int(value: bytes) -> int:
+    return int.from_bytes(value, "big")
+
+
+def _slot(slot: str) -> str:
+    return to_hex(to_int(slot))
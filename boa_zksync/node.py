@@ -1,14 +1,24 @@
 import logging
-import sys
-from subprocess import Popen
-from typing import Optional
+import re
+from pathlib import Path
+from subprocess import PIPE, STDOUT, Popen
+from threading import Event, Thread
+from typing import Optional, TextIO
 
 from boa.rpc import EthereumRPC
 
-from boa_zksync.util import find_free_port, stop_subprocess, wait_url
+from boa_zksync.codec import get_json_codec
+from boa_zksync.node_output import NodeOutput
+from boa_zksync.rpc import KeepAliveTransport, ZksyncRPC
+from boa_zksync.rpc_cache import DEFAULT_CACHE_PATH, CachingRPCProxy
+from boa_zksync.util import NodeExitedError, find_free_port, stop_subprocess, wait_node
 
+# the line the node prints once it accepts requests, e.g. "Listening on 0.0.0.0:8011"
+_LISTENING_LINE = re.compile(r"Listening on \S+:\d+")
+_START_ATTEMPTS = 3
 
-class AnvilZKsync(EthereumRPC):
+
+class AnvilZKsync(ZksyncRPC):
     # list of public+private keys for test accounts in the anvil-zksync
     TEST_ACCOUNTS = [
         (
@@ -58,26 +68,115 @@ class AnvilZKsync(EthereumRPC):
         inner_rpc: Optional[EthereumRPC] = None,
         block_identifier="safe",
         node_args=(),
+        rpc_cache: str | Path | bool = False,
     ):
+        """
+        Starts a local node, or a fork of `inner_rpc`.
+        :param inner_rpc: The RPC to fork from, if any.
+        :param block_identifier: The block to fork at, when forking.
+        :param node_args: Extra arguments for anvil-zksync.
+        :param rpc_cache: Fork through a `CachingRPCProxy`, so immutable upstream
+            responses are stored on disk. Either the database path, or True for
+            the default path.
+        """
         self.inner_rpc = inner_rpc
+        self.block_identifier = block_identifier
+        self.node_args = tuple(node_args)
+        # the snapshot to reset the node to, when it belongs to a `NodePool`
+        self.pool_snapshot: Optional[str] = None
+        # the output of the node, with a record per transaction
+        self.output = NodeOutput()
 
-        port = find_free_port()
         fork_at = (
             ["--fork-at", f"{block_identifier}"]
             if isinstance(block_identifier, int)
             else []
         )
-        command = (
-            ["fork", "--fork-url", inner_rpc._rpc_url] + fork_at
-            if inner_rpc
-            else ["run"]
-        )
-        args = ["anvil-zksync"] + list(node_args) + ["--port", f"{port}"] + command
-        self._test_node = Popen(args, stdout=sys.stdout, stderr=sys.stderr)
-
-        super().__init__(f"http://localhost:{port}")
+        self.rpc_proxy: Optional[CachingRPCProxy] = None
+        fork_url = inner_rpc._rpc_url if inner_rpc else None
+        if inner_rpc and rpc_cache:
+            cache_path = DEFAULT_CACHE_PATH if rpc_cache is True else rpc_cache
+            self.rpc_proxy = CachingRPCProxy(fork_url, cache_path)
+            fork_url = self.rpc_proxy.url
+        command = ["fork", "--fork-url", fork_url] + fork_at if inner_rpc else ["run"]
+        try:
+            self._start(node_args, command)
+        except BaseException:
+            # e.g. the binary is missing, or the node didn't start in time
+            self.stop()
+            raise
         logging.info(f"Started fork node at {self._rpc_url}")
-        wait_url(self._rpc_url)
+
+    def _start(self, node_args: tuple, command: list[str]):
+        """Starts the node process, and retries when it exits while starting."""
+        for attempt in range(1, _START_ATTEMPTS + 1):
+            # the port may be taken before the node binds it, so retry on exit
+            port = find_free_port()
+            args = ["anvil-zksync", *node_args, "--port", f"{port}", *command]
+            self._test_node, ready = _start_node(args, self.output)
+            super().__init__(f"http://localhost:{port}")
+            self._transport = KeepAliveTransport(self._rpc_url)
+            try:
+                wait_node(self._rpc_url, self._test_node, ready)
+                return
+            except NodeExitedError as e:
+                self._transport.close()
+                if attempt == _START_ATTEMPTS:
+                    output = "\n".join(self.output.tail())
+                    raise NodeExitedError(f"{e}, last output:\n{output}") from e
+                logging.warning(f"Node exited on port {port}, retrying")
+
+    @property
+    def config(self) -> tuple:
+        """The options the node was started with, nodes with equal options are interchangeable."""
+        inner_url = self.inner_rpc._rpc_url if self.inner_rpc else None
+        return node_config(inner_url, self.block_identifier, self.node_args)
+
+    def _post(self, request):
+        # the local node is called many times, see `KeepAliveTransport`
+        codec = get_json_codec()
+        return codec.loads(self._transport.post(codec.dumps(request)))
+
+    def stop(self):
+        # the node may have failed to start, before all of these were created
+        if (transport := getattr(self, "_transport", None)) is not None:
+            transport.close()
+        if (process := getattr(self, "_test_node", None)) is not None:
+            stop_subprocess(process)
+        if getattr(self, "rpc_proxy", None) is not None:
+            self.rpc_proxy.stop()
+            self.rpc_proxy = None
 
     def __del__(self):
-        stop_subprocess(self._test_node)
+        self.stop()
+
+
+def _start_node(
+    args: list[str], output: Optional[NodeOutput] = None
+) -> tuple[Popen, Event]:
+    """
+    Starts the node, capturing its output in the background.
+    :param args: The command to run.
+    :param output: The buffer for the output of the node.
+    :return: The process, and an event that is set when the node is listening.
+    """
+    process = Popen(args, stdout=PIPE, stderr=STDOUT, text=True, bufsize=1)
+    ready = Event()
+    Thread(
+        target=_read_output,
+        args=(process.stdout, ready, output or NodeOutput()),
+        daemon=True,
+    ).start()
+    return process, ready
+
+
+def _read_output(stream: TextIO, ready: Event, output: NodeOutput):
+    for line in stream:
+        if not ready.is_set() and _LISTENING_LINE.search(line):
+            ready.set()
+        output.add(line)
+
+
+def node_config(inner_url: Optional[str], block_identifier, node_args) -> tuple:
+    # the block identifier is ignored when not forking, see `AnvilZKsync.__init__`
+    return (inner_url, block_identifier if inner_url else None, tuple(node_args))
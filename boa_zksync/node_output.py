@@ -0,0 +1,136 @@
+"""
+Captures the output of an anvil-zksync node in memory, instead of printing it.
+The lines the node prints while executing a transaction, like the summary, the
+gas usage, calls and errors, are parsed into a record for that transaction.
+This gives diagnostics without any `debug_trace*` requests.
+"""
+
+import logging
+import re
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from threading import Condition
+from typing import Optional
+
+# the number of lines, of transactions, and of lines per transaction that are kept.
+# the calls and errors of a transaction are limited like its lines
+MAX_LINES = 10_000
+MAX_TRANSACTIONS = 256
+MAX_TX_LINES = 200
+
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+# e.g. "Executing 0x12...ab" or "Transaction Hash: 0x12...ab"
+_TX_START = re.compile(r"(?:Executing|Transaction Hash:?)\s+(0x[0-9a-fA-F]{64})\b")
+_TX_STATUS = re.compile(r"Transaction:\s+(SUCCESS|FAILED)")
+_GAS_LIMIT = re.compile(r"Gas Limit:\s*([\d_,]+)")
+_GAS_USED = re.compile(r"(?:Gas )?Used:\s*([\d_,]+)")
+_CALL = re.compile(r"Call\(\w+\)")
+_ERROR = re.compile(r"\b(?:ERROR|Error|Revert reason|Halt reason)\b")
+# box drawing characters and spaces around the call tree
+_TREE_CHARS = " \t│├└─┌┐┘┴┬┼"
+# the lines of a transaction after the gas summary, e.g. "Paid: 0.1 ETH", the call
+# tree or "==== Console logs:", with an optional log level
+_TX_DETAIL = re.compile(r"^(?:[A-Z]+\s+)?(?:[\s│├└─┌┐┘┴┬┼=]|Call\(|[\w ]+:\s)")
+# the problems the node reports, e.g. when it fails to start
+_LOG_LEVEL = re.compile(r"^\s*(ERROR|WARN)")
+
+
+@dataclass
+class TxOutput:
+    """The output of the node while executing a transaction."""
+
+    tx_hash: str
+    status: Optional[str] = None  # "SUCCESS" or "FAILED"
+    gas_limit: Optional[int] = None
+    gas_used: Optional[int] = None
+    calls: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    lines: list[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> bool:
+        return self.status == "FAILED"
+
+
+class NodeOutput:
+    """
+    A bounded buffer of the node output, and the records of the transactions
+    in it. Lines are added by the thread reading the node output.
+    """
+
+    def __init__(
+        self,
+        max_lines=MAX_LINES,
+        max_transactions=MAX_TRANSACTIONS,
+        max_tx_lines=MAX_TX_LINES,
+    ):
+        self.lines: deque[str] = deque(maxlen=max_lines)
+        self.max_transactions = max_transactions
+        self.max_tx_lines = max_tx_lines
+        self._transactions: OrderedDict[str, TxOutput] = OrderedDict()
+        self._current: Optional[TxOutput] = None
+        self._changed = Condition()
+
+    def add(self, line: str):
+        line = _ANSI_ESCAPE.sub("", line.rstrip("\n"))
+        with self._changed:
+            self.lines.append(line)
+            self._parse(line)
+            self._changed.notify_all()
+        if match := _LOG_LEVEL.match(line):
+            level = logging.ERROR if match.group(1) == "ERROR" else logging.WARNING
+            logging.log(level, f"anvil-zksync: {line}")
+
+    def tail(self, count: int = 20) -> list[str]:
+        """The last lines of output."""
+        with self._changed:
+            return list(self.lines)[-count:]
+
+    def get_tx(self, tx_hash: str, timeout: float = 0.0) -> Optional[TxOutput]:
+        """
+        Gets the record of a transaction. The output is read in the background,
+        so it may lag behind the RPC responses.
+        :param tx_hash: The hash of the transaction.
+        :param timeout: The seconds to wait for the transaction to appear.
+        :return: The record, or None if the node didn't print the transaction.
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: tx_hash.lower() in self._transactions, timeout
+            )
+            return self._transactions.get(tx_hash.lower())
+
+    def _parse(self, line: str):
+        if match := _TX_START.search(line):
+            tx_hash = match.group(1).lower()
+            if (current := self._transactions.get(tx_hash)) is None:
+                current = self._transactions[tx_hash] = TxOutput(tx_hash)
+                if len(self._transactions) > self.max_transactions:
+                    self._transactions.popitem(last=False)
+            self._current = current
+        elif self._current is not None and self._current.gas_used is not None:
+            # after the summary, only the call tree and errors follow
+            if not (_TX_DETAIL.match(line) or _ERROR.search(line)):
+                self._current = None  # e.g. the logs of the next request
+        current = self._current
+        if current is None:
+            return  # e.g. the banner while the node is starting
+
+        if len(current.lines) < self.max_tx_lines:
+            current.lines.append(line)
+        if match := _TX_STATUS.search(line):
+            current.status = match.group(1)
+        rest = line
+        if match := _GAS_LIMIT.search(line):
+            current.gas_limit = _to_int(match.group(1))
+            rest = line[match.end() :]  # e.g. "Gas Limit: 1_000 | Used: 100"
+        if match := _GAS_USED.search(rest):
+            current.gas_used = _to_int(match.group(1))
+        if _CALL.search(line) and len(current.calls) < self.max_tx_lines:
+            current.calls.append(line.strip(_TREE_CHARS))
+        if _ERROR.search(line) and len(current.errors) < self.max_tx_lines:
+            current.errors.append(line.strip(_TREE_CHARS))
+
+
+def _to_int(value: str) -> int:
+    return int(value.replace("_", "").replace(",", ""))
@@ -0,0 +1,196 @@
+"""
+A pool of anvil-zksync nodes that are started in the background, so tests don't
+have to wait for a node to boot. Nodes are reset with a snapshot when they are
+returned to the pool, instead of being restarted.
+"""
+
+import logging
+import time
+import weakref
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Iterator, Optional
+
+from boa.rpc import EthereumRPC, RPCError
+from requests import RequestException
+
+from boa_zksync.node import AnvilZKsync, node_config
+
+
+@dataclass
+class NodePoolStats:
+    # nodes that were ready when they were acquired
+    hits: int = 0
+    # nodes that were still booting, or had to be started when acquired
+    misses: int = 0
+    # seconds from starting each node until it accepted requests
+    startup_times: list[float] = field(default_factory=list)
+
+    @property
+    def mean_startup_time(self) -> Optional[float]:
+        if not self.startup_times:
+            return None
+        return sum(self.startup_times) / len(self.startup_times)
+
+
+class NodePool:
+    """
+    Keeps up to `size` anvil-zksync nodes ready for every node configuration
+    that was requested, and starts replacements in the background.
+    """
+
+    def __init__(self, size: int = 2, node_args=()):
+        """
+        :param size: The number of ready nodes to keep per configuration.
+        :param node_args: The arguments of the nodes to start right away.
+        """
+        self.size = size
+        self.stats = NodePoolStats()
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(size, thread_name_prefix="anvil-zksync")
+        self._nodes: dict[tuple, deque[Future[AnvilZKsync]]] = defaultdict(deque)
+        # stop the nodes when the pool is garbage collected, or at exit
+        self._finalizer = weakref.finalize(
+            self, _stop_nodes, self._executor, self._nodes
+        )
+        self.warm(node_args=node_args)
+
+    def warm(
+        self,
+        inner_rpc: Optional[EthereumRPC] = None,
+        block_identifier="safe",
+        node_args=(),
+    ):
+        """
+        Starts nodes in the background, until `size` nodes with the given
+        options are ready or booting. Takes the same arguments as `AnvilZKsync`.
+        """
+        config = _config(inner_rpc, block_identifier, node_args)
+        with self._lock:
+            nodes = self._nodes[config]
+            while len(nodes) < self.size:
+                nodes.append(
+                    self._executor.submit(
+                        self._start, inner_rpc, block_identifier, node_args
+                    )
+                )
+
+    def acquire(
+        self,
+        inner_rpc: Optional[EthereumRPC] = None,
+        block_identifier="safe",
+        node_args=(),
+    ) -> AnvilZKsync:
+        """
+        Takes a node out of the pool, or starts one if none is available.
+        A replacement is started in the background.
+        Takes the same arguments as `AnvilZKsync`.
+        """
+        config = _config(inner_rpc, block_identifier, node_args)
+        with self._lock:
+            nodes = self._nodes[config]
+            future = nodes.popleft() if nodes else None
+            if future is not None and _is_started(future):
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+        node = None
+        if future is not None:
+            try:
+                node = future.result()
+            except Exception as e:
+                # try again, e.g. the port was taken while the node was booting
+                logging.warning(f"Could not start a node in the background: {e}")
+        if node is None:
+            node = self._start(inner_rpc, block_identifier, node_args)
+        self.warm(inner_rpc, block_identifier, node_args)
+        return node
+
+    def release(self, node: AnvilZKsync):
+        """
+        Resets a node to the state it had when it was started, and returns it to
+        the pool. If the pool is full, the last node is stopped instead, since
+        that one may still be booting. The node is stopped if the reset fails.
+        """
+        try:
+            reverted = node.fetch("evm_revert", [node.pool_snapshot])
+            # snapshots can only be reverted once
+            node.pool_snapshot = node.fetch("evm_snapshot", [])
+        except (RPCError, RequestException) as e:
+            reverted = False
+            logging.warning(f"Could not reset node at {node._rpc_url}: {e}")
+        if not reverted:
+            node.stop()
+            return
+
+        future: Future[AnvilZKsync] = Future()
+        future.set_result(node)
+        with self._lock:
+            nodes = self._nodes[node.config]
+            # put it first, it's ready unlike the replacements that may be booting
+            nodes.appendleft(future)
+            surplus = nodes.pop() if len(nodes) > self.size else None
+        if surplus is not None:
+            _discard(surplus)
+
+    @contextmanager
+    def node(self, *args, **kwargs) -> Iterator[AnvilZKsync]:
+        """Acquires a node for the duration of the context, see `acquire`."""
+        node = self.acquire(*args, **kwargs)
+        try:
+            yield node
+        finally:
+            self.release(node)
+
+    def close(self):
+        """Stops all the nodes in the pool."""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start(
+        self, inner_rpc: Optional[EthereumRPC], block_identifier, node_args
+    ) -> AnvilZKsync:
+        start = time.perf_counter()
+        node = AnvilZKsync(inner_rpc, block_identifier, node_args)
+        node.pool_snapshot = node.fetch("evm_snapshot", [])
+        with self._lock:
+            self.stats.startup_times.append(time.perf_counter() - start)
+        return node
+
+
+def _config(inner_rpc: Optional[EthereumRPC], block_identifier, node_args) -> tuple:
+    inner_url = inner_rpc._rpc_url if inner_rpc else None
+    return node_config(inner_url, block_identifier, node_args)
+
+
+def _is_started(future: Future[AnvilZKsync]) -> bool:
+    return future.done() and not future.cancelled() and future.exception() is None
+
+
+def _discard(future: Future[AnvilZKsync]):
+    # stop the node once it has started, unless it didn't start yet
+    if not future.cancel():
+        future.add_done_callback(_stop_node)
+
+
+def _stop_node(future: Future[AnvilZKsync]):
+    if _is_started(future):
+        future.result().stop()
+
+
+def _stop_nodes(executor: ThreadPoolExecutor, nodes: dict[tuple, deque[Future]]):
+    executor.shutdown(wait=True, cancel_futures=True)
+    for futures in nodes.values():
+        for future in futures:
+            if not future.cancelled():
+                _stop_node(future)
+    nodes.clear()
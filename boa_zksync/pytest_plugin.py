@@ -0,0 +1,120 @@
+"""
+A pytest plugin that runs every test against a zkSync env in an anchor, so the
+changes of one test are reverted before the next one. Fixtures with a wider scope
+are set up outside of these anchors, so their deployments are shared by all tests.
+Anchors only snapshot the node before the first change, so they are free for
+read-only tests, and nest at no cost in the anchors of boa's own pytest plugin.
+
+With pytest-xdist, every worker runs its own session: `zksync_node` starts one
+node per worker, and `zksync_shared_state` deploys session fixtures in a single
+worker, and loads them in the others. Compilations are shared through boa's disk cache.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable
+
+import boa
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addini(
+        "zksync_node_args",
+        type="args",
+        default=[],
+        help="Extra arguments for the anvil-zksync node of `zksync_node`",
+    )
+
+
+@pytest.fixture(autouse=True)
+def zksync_isolation(request):
+    """
+    Wraps the test and its function-scoped fixtures in an anchor of the zkSync env.
+    Tests marked with `ignore_isolation` are not wrapped.
+    """
+    # imported here, so pytest starts fast when the plugin is not used
+    from boa_zksync.environment import ZksyncEnv
+
+    env = boa.env
+    if request.node.get_closest_marker("ignore_isolation") or not isinstance(
+        env, ZksyncEnv
+    ):
+        yield env
+        return
+    with env.anchor():
+        yield env
+
+
+@pytest.fixture(scope="session")
+def zksync_node(pytestconfig):
+    """
+    A local anvil-zksync node for the whole session, i.e. one per xdist worker.
+    Use it in a `ZksyncEnv`, the anchors revert the changes of every test.
+    """
+    from boa_zksync.node import AnvilZKsync
+
+    node = AnvilZKsync(node_args=pytestconfig.getini("zksync_node_args"))
+    yield node
+    node.stop()
+
+
+@pytest.fixture(scope="session")
+def zksync_shared_state(tmp_path_factory) -> Callable[[str, Callable[[], Any]], Any]:
+    """
+    Returns `share(name, setup)`. The first worker to call it runs `setup`, which
+    deploys contracts in `boa.env`, and saves the node state. The other workers
+    load that state instead of running `setup`. `setup` may return a contract, or
+    a list or dict of contracts, which are returned by `share` in every worker.
+    """
+    directory = tmp_path_factory.getbasetemp()
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        directory = directory.parent  # shared by the workers of this run
+
+    def share(name: str, setup: Callable[[], Any]) -> Any:
+        state_path = directory / f"{name}.state.json"
+        contracts_path = directory / f"{name}.contracts.json"
+        with _file_lock(directory / f"{name}.lock"):
+            if contracts_path.exists():
+                boa.env.load_state(state_path)
+                return _to_contracts(json.loads(contracts_path.read_text()))
+            result = setup()
+            boa.env.dump_state(state_path)
+            # written last, the state is only loaded when both files are complete
+            contracts_path.write_text(json.dumps(_to_addresses(result)))
+            return result
+
+    return share
+
+
+@contextmanager
+def _file_lock(path: Path):
+    # imported here, since it's not available on Windows
+    import fcntl
+
+    with open(path, "w") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def _to_addresses(result):
+    if isinstance(result, (list, tuple)):
+        return [_to_addresses(item) for item in result]
+    if isinstance(result, dict):
+        return {key: _to_addresses(value) for key, value in result.items()}
+    if not hasattr(result, "address"):
+        raise TypeError(f"Cannot share {result!r}, only contracts can be shared")
+    return str(result.address)
+
+
+def _to_contracts(addresses):
+    if isinstance(addresses, list):
+        return [_to_contracts(item) for item in addresses]
+    if isinstance(addresses, dict):
+        return {key: _to_contracts(value) for key, value in addresses.items()}
+    return boa.env.lookup_contract(addresses)
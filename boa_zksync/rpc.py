@@ -0,0 +1,127 @@
+import selectors
+import socket
+from http.client import HTTPConnection, HTTPException
+from threading import Lock
+from urllib.parse import urlsplit
+
+from boa.rpc import TIMEOUT, EthereumRPC, RPCError
+from requests import ConnectionError, HTTPError
+
+from boa_zksync.codec import get_json_codec
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# the idle connections a transport keeps open, e.g. one per `prefetch` worker
+MAX_IDLE_CONNECTIONS = 8
+
+
+class ZksyncRPC(EthereumRPC):
+    """
+    An EthereumRPC that encodes and decodes payloads with the configured JSON codec.
+    See `boa_zksync.codec.set_json_codec`.
+    """
+
+    def _post(self, request):
+        codec = get_json_codec()
+        response = self._session.post(
+            self._rpc_url,
+            data=codec.dumps(request),
+            headers=_JSON_HEADERS,
+            timeout=TIMEOUT,
+        )
+        response.raise_for_status()
+        return codec.loads(response.content)
+
+    def fetch(self, method, params):
+        # not dispatched into fetch_multi, see EthereumRPC.fetch
+        req = {"jsonrpc": "2.0", "method": method, "params": params, "id": 0}
+        res = self._post(req)
+        if "error" in res:
+            raise RPCError.from_json(res["error"])
+        return res["result"]
+
+    def fetch_multi(self, payloads):
+        request = [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": i}
+            for i, (method, params) in enumerate(payloads)
+        ]
+        results = {}  # keep results in a dict to preserve order
+        for item in self._post(request):
+            if "error" in item:
+                raise RPCError.from_json(item["error"])
+            results[item["id"]] = item["result"]
+
+        return [results[i] for i in range(len(payloads))]
+
+
+class KeepAliveTransport:
+    """
+    Posts requests over persistent HTTP/1.1 connections, using `http.client`
+    directly. This skips most of the work `requests` does for every request, which
+    adds up over the many calls to a local node. Each request takes an idle
+    connection from a pool, or opens one, and returns it afterwards. At most
+    `max_idle` connections are kept open, also when many threads send requests.
+    Errors are raised as the `requests` exceptions, like in `ZksyncRPC`.
+    """
+
+    def __init__(
+        self, url: str, timeout: float = TIMEOUT, max_idle: int = MAX_IDLE_CONNECTIONS
+    ):
+        self.url = url
+        parts = urlsplit(url)
+        self._host, self._port = parts.hostname, parts.port
+        self._path = parts.path or "/"
+        self._timeout = timeout
+        self.max_idle = max_idle
+        self._idle: list[HTTPConnection] = []  # the most recently used last
+        self._lock = Lock()
+
+    def post(self, body: bytes) -> bytes:
+        connection = self._acquire()
+        try:
+            connection.request("POST", self._path, body, _JSON_HEADERS)
+            response = connection.getresponse()
+            content = response.read()
+        except (OSError, HTTPException) as e:
+            connection.close()
+            raise ConnectionError(f"{e!r} for url {self.url}") from e
+        self._release(connection)
+        if response.status >= 400:
+            raise HTTPError(f"{response.status} {response.reason} for url {self.url}")
+        return content
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _acquire(self) -> HTTPConnection:
+        with self._lock:
+            while self._idle:
+                connection = self._idle.pop()
+                if connection.sock is None or not _is_dropped(connection.sock):
+                    return connection
+                connection.close()
+        return _Connection(self._host, self._port, timeout=self._timeout)
+
+    def _release(self, connection: HTTPConnection):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+
+class _Connection(HTTPConnection):
+    def connect(self):
+        super().connect()
+        # like urllib3, send small requests right away
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+def _is_dropped(sock) -> bool:
+    # an idle connection is only readable when the server closed it.
+    # unlike select.select, selectors work with file descriptors over 1024
+    with selectors.DefaultSelector() as selector:
+        selector.register(sock, selectors.EVENT_READ)
+        return bool(selector.select(0))
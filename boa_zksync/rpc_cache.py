@@ -0,0 +1,228 @@
+"""
+A local JSON-RPC proxy that forks can be started through. Responses that can't
+change anymore, like the code or storage at a given block number, are stored in
+a SQLite database, so the next fork of the same block is served from disk.
+"""
+
+import logging
+import sqlite3
+from hashlib import sha256
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Optional
+
+import requests
+from boa.rpc import TIMEOUT
+
+from boa_zksync.codec import get_json_codec
+
+DEFAULT_CACHE_PATH = Path("~/.cache/titanoboa/zksync-rpc.sqlite3")
+# how often the server checks whether it should stop, in seconds
+_POLL_INTERVAL = 0.05
+
+# the methods with immutable results, with the index of their block parameter.
+# None when the request is keyed by a hash, so the result never changes.
+_CACHEABLE_METHODS: dict[str, Optional[int]] = {
+    "eth_chainId": None,
+    "eth_getBalance": 1,
+    "eth_getBlockByHash": None,
+    "eth_getBlockByNumber": 0,
+    "eth_getBlockTransactionCountByNumber": 0,
+    "eth_getCode": 1,
+    "eth_getStorageAt": 2,
+    "eth_getTransactionByHash": None,
+    "eth_getTransactionCount": 1,
+    "eth_getTransactionReceipt": None,
+    "zks_getBlockDetails": 0,
+    "zks_getBytecodeByHash": None,
+    "zks_getRawBlockTransactions": 0,
+}
+# keyed by a hash, but only final once they are mined
+_MINED_METHODS = ("eth_getTransactionByHash", "eth_getTransactionReceipt")
+
+
+class CachingRPCProxy:
+    """
+    Forwards JSON-RPC requests to `upstream_url`, and caches the immutable
+    responses on disk. It serves requests on `url` from a background thread.
+    """
+
+    def __init__(self, upstream_url: str, cache_path: str | Path = DEFAULT_CACHE_PATH):
+        """
+        :param upstream_url: The RPC to forward requests to.
+        :param cache_path: The SQLite database to store the responses in.
+        """
+        self.upstream_url = upstream_url
+        self.hits = 0
+        self.misses = 0
+        self._cache = _ResponseCache(Path(cache_path).expanduser())
+        # responses of different RPCs are kept apart, without storing the URL
+        self._key_prefix = sha256(upstream_url.encode()).hexdigest()[:16]
+        self._session = requests.Session()
+        self._lock = Lock()
+        # the OS picks the port while binding, so it can't be taken in between
+        self._server = ThreadingHTTPServer(("localhost", 0), _handler_class(self))
+        self._server.daemon_threads = True
+        self.url = f"http://localhost:{self._server.server_port}"
+        Thread(
+            target=self._server.serve_forever, args=(_POLL_INTERVAL,), daemon=True
+        ).start()
+        logging.info(f"Started RPC cache at {self.url} for {upstream_url}")
+
+    def handle(self, payload: dict | list) -> dict | list:
+        """
+        Answers a JSON-RPC request or batch, from the cache where possible.
+        The requests missing from the cache are forwarded in a single batch.
+        """
+        items = payload if isinstance(payload, list) else [payload]
+        keys = [self._cache_key(request) for request in items]
+        responses = [self._cache.get(key) if key is not None else None for key in keys]
+        missing = [i for i, response in enumerate(responses) if response is None]
+        with self._lock:
+            self.hits += len(items) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            batch = [items[i] for i in missing]
+            results = self._forward(batch if isinstance(payload, list) else batch[0])
+            results_by_id = {
+                result.get("id"): result
+                for result in (results if isinstance(results, list) else [results])
+            }
+            for i in missing:
+                result = results_by_id.get(items[i].get("id"))
+                if result is None:
+                    result = _error(items[i], "No response from upstream RPC")
+                elif keys[i] is not None and _is_final(items[i], result.get("result")):
+                    self._cache.set(keys[i], result["result"])
+                responses[i] = result
+
+        for request, response in zip(items, responses):
+            # cached responses are stored without an id
+            response.setdefault("jsonrpc", "2.0")
+            response["id"] = request.get("id")
+        return responses if isinstance(payload, list) else responses[0]
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._cache.close()
+
+    def _forward(self, payload: dict | list) -> dict | list:
+        codec = get_json_codec()
+        response = self._session.post(
+            self.upstream_url,
+            data=codec.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=TIMEOUT,
+        )
+        response.raise_for_status()
+        return codec.loads(response.content)
+
+    def _cache_key(self, request: dict) -> Optional[str]:
+        method, params = request.get("method"), request.get("params") or []
+        if method not in _CACHEABLE_METHODS:
+            return None
+        block_index = _CACHEABLE_METHODS[method]
+        if block_index is not None and not _is_pinned(params, block_index):
+            return None
+        return f"{self._key_prefix}:{method}:{get_json_codec().dumps(params).decode()}"
+
+
+def _is_pinned(params: list, block_index: int) -> bool:
+    # block numbers are final, block tags like "latest" are not
+    if len(params) <= block_index:
+        return False
+    block = params[block_index]
+    return isinstance(block, int) or (isinstance(block, str) and block.startswith("0x"))
+
+
+def _is_final(request: dict, result) -> bool:
+    # e.g. pending transactions, or receipts that don't exist yet
+    if result is None:
+        return False
+    if request.get("method") in _MINED_METHODS:
+        return isinstance(result, dict) and result.get("blockNumber") is not None
+    return True
+
+
+def _error(request: dict, message: str, code=-32603) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": request.get("id"),
+        "error": {"code": code, "message": message},
+    }
+
+
+class _ResponseCache:
+    """A key-value store in SQLite, shared by the threads of the proxy."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # allow other processes to read while one writes, e.g. with pytest-xdist
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, result BLOB)"
+        )
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"result": get_json_codec().loads(row[0])}
+
+    def set(self, key: str, result):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?)",
+                (key, get_json_codec().dumps(result)),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _handler_class(proxy: CachingRPCProxy) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            codec = get_json_codec()
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = codec.loads(self.rfile.read(length))
+            except ValueError as e:
+                self._send_json(_error({}, f"Parse error: {e}", code=-32700))
+                return
+            try:
+                response = proxy.handle(payload)
+            except (
+                requests.RequestException,
+                # a malformed request, or a malformed response of the upstream RPC
+                ValueError,
+                KeyError,
+                TypeError,
+                AttributeError,
+            ) as e:
+                self.send_error(HTTPStatus.BAD_GATEWAY, str(e))
+                return
+            self._send_json(response)
+
+        def _send_json(self, response: dict | list):
+            body = get_json_codec().dumps(response)
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.debug(f"RPC cache: {format % args}")
+
+    return Handler
@@ -0,0 +1,82 @@
+"""
+Reads storage variables directly with `eth_getStorageAt`, using the storage layout
+returned by zkvyper>=1.5.3.
+"""
+
+from typing import Callable, Optional
+
+from boa.util.abi import abi_decode, abi_encode
+from vyper.semantics.types import DArrayT, HashMapT, VyperType
+from vyper.semantics.types.bytestrings import _BytestringT
+from vyper.utils import ceil32, keccak256
+
+# reads the given number of consecutive storage words, starting at the given slot
+ReadWords = Callable[[int, int], bytes]
+
+
+def get_storage_slot(layout: Optional[dict], name: str) -> Optional[int]:
+    """
+    Gets the storage slot of a top-level variable from the compiler layout.
+    :return: The slot, or None if the variable is not in the storage layout.
+    """
+    item = (layout or {}).get("storage_layout", {}).get(name)
+    if not isinstance(item, dict) or not isinstance(item.get("slot"), int):
+        return None
+    return item["slot"]
+
+
+def is_readable(typ: VyperType) -> bool:
+    """
+    Checks whether values of this type can be decoded from raw storage words.
+    Dynamic arrays of dynamic types are not supported.
+    """
+    while isinstance(typ, HashMapT):
+        typ = typ.value_type
+    if not typ.abi_type.is_dynamic() or isinstance(typ, _BytestringT):
+        return True
+    return isinstance(typ, DArrayT) and not typ.value_type.abi_type.is_dynamic()
+
+
+def get_slot(slot: int, typ: VyperType, keys: list) -> tuple[int, VyperType]:
+    """
+    Computes the storage slot of a (nested) HashMap value.
+    :param slot: The slot of the HashMap variable.
+    :param typ: The type of the HashMap variable.
+    :param keys: The keys to look up, one for each level of nesting.
+    :return: The slot and the type of the value.
+    """
+    for key in keys:
+        assert isinstance(typ, HashMapT), f"Too many keys for {typ}"
+        if isinstance(typ.key_type, _BytestringT):
+            encoded_key = keccak256(key.encode() if isinstance(key, str) else key)
+        else:
+            encoded_key = abi_encode(typ.key_type.abi_type.selector_name(), key)
+        # vyper hashes the slot first, unlike solidity
+        slot = int.from_bytes(keccak256(slot.to_bytes(32, "big") + encoded_key), "big")
+        typ = typ.value_type
+    return slot, typ
+
+
+def read_storage(read_words: ReadWords, slot: int, typ: VyperType):
+    """
+    Reads and decodes a value from storage. Every value type takes a full word,
+    so static types are stored just like they are ABI encoded. Dynamic types
+    store their length in the first word, followed by the data.
+    """
+    abi_type = typ.abi_type.selector_name()
+    if not typ.abi_type.is_dynamic():
+        return abi_decode(abi_type, read_words(slot, typ.storage_size_in_words))
+
+    length = int.from_bytes(read_words(slot, 1), "big")
+    if isinstance(typ, _BytestringT):
+        data_words = ceil32(length) // 32
+    else:
+        data_words = length * typ.value_type.storage_size_in_words
+    data = read_words(slot + 1, data_words) if data_words else b""
+    if isinstance(typ, _BytestringT):
+        # clear leftovers from longer values that were stored before
+        data = data[:length].ljust(data_words * 32, b"\0")
+    # decode as a single-element tuple: the offset to the data, length and data
+    encoded = (32).to_bytes(32, "big") + length.to_bytes(32, "big") + data
+    (value,) = abi_decode(f"({abi_type})", encoded)
+    return value
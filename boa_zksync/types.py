@@ -1,6 +1,7 @@
 import warnings
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, fields
 from functools import cached_property
+from hashlib import sha256
 from typing import TYPE_CHECKING, Optional
 
 import rlp
@@ -27,7 +28,11 @@ if TYPE_CHECKING:
 
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 CONTRACT_DEPLOYER_ADDRESS = "0x0000000000000000000000000000000000008006"
+L2_BASE_TOKEN_ADDRESS = "0x000000000000000000000000000000000000800a"
 DEFAULT_SALT = b"\0" * 32
+# system contracts (bootloader, deployer, nonce holder, ...) and precompiles
+# all live in the kernel space, below this address
+_KERNEL_SPACE_END = 2**16
 
 _EIP712_TYPE = bytes.fromhex("71")
 _EIP712_TYPES_SPEC = {
@@ -257,6 +262,23 @@ class ZksyncCompilerData:
     ast: Optional[dict] = None
     assembly: Optional[str] = None
 
+    @cached_property
+    def bytecode_hash(self) -> bytes:
+        return hash_code(self.bytecode)
+
+    def as_json_dict(self) -> dict:
+        """The compiler output in a JSON-compatible format, see `from_json_dict`."""
+        ret = {f.name: getattr(self, f.name) for f in fields(self)}
+        return {
+            **ret,
+            "zkvyper_version": str(ret["zkvyper_version"]),
+            "bytecode": to_hex(self.bytecode),
+        }
+
+    @classmethod
+    def from_json_dict(cls, data: dict) -> "ZksyncCompilerData":
+        return cls(**{**data, "bytecode": to_bytes(data["bytecode"])})
+
     @cached_property
     def global_ctx(self):
         return self.vyper.global_ctx
@@ -318,7 +340,9 @@ class ZksyncComputation:
     value: int = 0
 
     @classmethod
-    def from_call_trace(cls, env: "ZksyncEnv", output: dict) -> "ZksyncComputation":
+    def from_call_trace(
+        cls, env: "ZksyncEnv", output: dict, keep_system_frames=False
+    ) -> "ZksyncComputation":
         """Recursively constructs a ZksyncComputation from a debug_traceCall output."""
         error = None
         if output.get("error") is not None:
@@ -337,9 +361,7 @@ class ZksyncComputation:
             ),
             output=to_bytes(output["output"]),
             error=error,
-            children=[
-                cls.from_call_trace(env, call) for call in output.get("calls", [])
-            ],
+            children=cls._children_from_call_trace(env, output, keep_system_frames),
             gas_used=int(output["gasUsed"], 16),
             revert_reason=output.get("revertReason"),
             type=output.get("type", "Call"),
@@ -347,7 +369,24 @@ class ZksyncComputation:
         )
 
     @classmethod
-    def from_debug_trace(cls, env: "ZksyncEnv", output: dict):
+    def _children_from_call_trace(
+        cls, env: "ZksyncEnv", output: dict, keep_system_frames: bool
+    ) -> list["ZksyncComputation"]:
+        """
+        Constructs the children of a trace frame. Unless `keep_system_frames` is set,
+        calls into system contracts are collapsed: they are not parsed themselves,
+        and any user contract frames nested inside them are hoisted in their place.
+        """
+        children = []
+        for call in output.get("calls") or []:
+            if keep_system_frames or not is_system_contract(call["to"]):
+                children.append(cls.from_call_trace(env, call, keep_system_frames))
+            else:
+                children += cls._children_from_call_trace(env, call, keep_system_frames)
+        return children
+
+    @classmethod
+    def from_debug_trace(cls, env: "ZksyncEnv", output: dict, keep_system_frames=False):
         """
         Finds the actual transaction computation, since zksync has system
         contract calls in the trace.
@@ -357,15 +396,15 @@ class ZksyncComputation:
 
         def _find(calls: list[dict]):
             for trace in calls:
-                if found := _find(trace["calls"]):
+                if found := _find(trace.get("calls") or []):
                     return found
                 if trace["to"] == to and trace["from"] == sender:
-                    return cls.from_call_trace(env, trace)
+                    return cls.from_call_trace(env, trace, keep_system_frames)
 
-        if result := _find(output["calls"]):
+        if result := _find(output.get("calls") or []):
             return result
         # in production mode the result is not always nested
-        return cls.from_call_trace(env, output)
+        return cls.from_call_trace(env, output, keep_system_frames)
 
     @property
     def is_success(self) -> bool:
@@ -407,3 +446,23 @@ class ZksyncComputation:
         source = contract.trace_source(self) if contract else None
         children = [child._get_call_trace(depth + 1) for child in self.children]
         return TraceFrame(self, source, depth, children)
+
+
+def is_system_contract(address: str) -> bool:
+    """
+    Checks whether the address belongs to a zkSync system contract or precompile.
+    """
+    return int(address, 16) < _KERNEL_SPACE_END
+
+
+def hash_code(bytecode: bytes) -> bytes:
+    """
+    Hashes the bytecode for contract deployment, according to the zkSync spec.
+    Based on https://github.com/zksync-sdk/zksync2-python/blob/d33eff9/zksync2/core/utils.py#L45
+    """
+    bytecode_len = len(bytecode)
+    bytecode_size = int(bytecode_len / 32)
+    assert bytecode_len % 32 == 0, "Bytecode length must be a multiple of 32 bytes"
+    assert bytecode_size < 2**16, "Bytecode length must be less than 2^16"
+    bytecode_hash = sha256(bytecode).digest()
+    return b"\x01\00" + bytecode_size.to_bytes(2, byteorder="big") + bytecode_hash[4:]
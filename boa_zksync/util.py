@@ -1,35 +1,84 @@
 import os
 import socket
 import warnings
-from datetime import datetime, timedelta
 from subprocess import Popen, TimeoutExpired
-from time import sleep
+from threading import Event
+from time import monotonic, sleep
 
 import requests
-from requests.exceptions import ConnectionError
+from requests.exceptions import RequestException
+
+_POLL_INTERVAL = 0.01
+_CHAIN_ID_REQUEST = {"jsonrpc": "2.0", "method": "eth_chainId", "params": [], "id": 0}
 
 
 def find_free_port():
-    # https://gist.github.com/bertjwregeer/0be94ced48383a42e70c3d9fff1f4ad0
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    s.bind(("0.0.0.0", 0))
-    portnum = s.getsockname()[1]
-    s.close()
-    return portnum
-
-
-def wait_url(url: str):
-    timeout = datetime.now() + timedelta(seconds=10)
-    while datetime.now() < timeout:
-        try:
-            requests.head(url)
+    """
+    Reserves a free port for a node. A connection to the port is closed on the
+    server side first, which leaves the port in the TIME_WAIT state. The OS won't
+    hand it out again for a while, e.g. to other pytest-xdist workers looking for
+    a port, but the node can bind it since servers set SO_REUSEADDR.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        address = server.getsockname()
+        with socket.create_connection(address) as client:
+            connection, _ = server.accept()
+            connection.close()
+            client.recv(1)  # wait until the server side is closed
+    return address[1]
+
+
+class NodeExitedError(RuntimeError):
+    pass
+
+
+def wait_node(url: str, process: Popen, ready: Event, timeout=10.0):
+    """
+    Waits until a node accepts requests. The node output sets `ready` once
+    it's listening, and a JSON-RPC request is sent as a fallback.
+    :raises NodeExitedError: If the node exits before it's ready.
+    :raises TimeoutError: If the node is not ready after `timeout` seconds.
+    """
+    deadline = monotonic() + timeout
+    while monotonic() < deadline:
+        if ready.wait(_POLL_INTERVAL) or _accepts_requests(url):
+            return
+        if (code := process.poll()) is not None:
+            raise NodeExitedError(f"Node at {url} exited with code {code}")
+    raise TimeoutError(f"Could not connect to {url}")
+
+
+def wait_url(url: str, timeout=10.0) -> str:
+    """
+    Waits until a node accepts requests, by polling it.
+    Deprecated, `wait_node` also uses the output of the node and notices when it exits.
+    """
+    warnings.warn(
+        "wait_url is deprecated and will be removed in a future release, "
+        "use wait_node instead.",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    deadline = monotonic() + timeout
+    while monotonic() < deadline:
+        if _accepts_requests(url):
             return url
-        except ConnectionError:
-            sleep(0.1)
+        sleep(_POLL_INTERVAL)
     raise TimeoutError(f"Could not connect to {url}")
 
 
+def _accepts_requests(url: str) -> bool:
+    # connecting to a port that is not bound yet fails right away
+    try:
+        response = requests.post(url, json=_CHAIN_ID_REQUEST, timeout=1)
+    except RequestException:
+        return False
+    return response.ok
+
+
 def stop_subprocess(proc: Popen[bytes]):
     proc.terminate()
     try:
@@ -1,17 +1,34 @@
 import re
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import cached_property
 from http import HTTPStatus
-from typing import Optional
+from typing import Any, Iterable, Iterator, Optional
 
 import requests
 from boa.util.abi import Address
 from boa.verifiers import VerificationResult
 
+from boa_zksync.codec import get_json_codec
+
 DEFAULT_ZKSYNC_EXPLORER_URI = "https://zksync2-mainnet-explorer.zksync.io"
 
 
+@dataclass
+class BatchVerificationResult:
+    """The outcome of verifying one of the contracts passed to `verify_many`."""
+
+    contract: Any
+    verification_id: Optional[str]  # None if the submission failed
+    error: Optional[Exception] = None
+
+    @property
+    def verified(self) -> bool:
+        return self.error is None
+
+
 @dataclass
 class ZksyncExplorer:
     """
@@ -48,6 +65,96 @@ class ZksyncExplorer:
         :param wait: Whether to return a VerificationResult immediately
                      or wait for verification to complete. Defaults to False
         """
+        verification_id = self._submit(
+            address, contract_name, solc_json, constructor_calldata
+        )
+        if not wait:
+            return VerificationResult(verification_id, self)  # type: ignore
+
+        self.wait_for_verification(verification_id)
+        return None
+
+    def verify_many(
+        self, contracts: Iterable, max_workers: int = 8
+    ) -> Iterator[BatchVerificationResult]:
+        """
+        Verifies many contracts at once, e.g. after a release. The verifications are
+        submitted concurrently, and all pending ones are polled together, with the
+        backoff shared between them.
+        :param contracts: The deployed zkSync contracts.
+        :param max_workers: The number of concurrent requests.
+        :return: The results, in the order the verifications finish.
+        """
+        deadline = datetime.now() + self.timeout
+        wait_time = self.backoff
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="verify") as executor:
+            submitting: dict[Future, Any] = {
+                executor.submit(
+                    self._submit,
+                    contract.address,
+                    contract.contract_name,
+                    contract.deployer.solc_json,
+                    contract.constructor_calldata,
+                ): contract
+                for contract in contracts
+            }
+            pending: dict[str, Any] = {}  # the contracts by verification id
+            while submitting or pending:
+                for future in [future for future in submitting if future.done()]:
+                    contract = submitting.pop(future)
+                    try:
+                        pending[future.result()] = contract
+                    except (requests.RequestException, ValueError) as e:
+                        yield BatchVerificationResult(contract, None, e)
+
+                ids = list(pending)
+                polls = [executor.submit(self.is_verified, id_) for id_ in ids]
+                for verification_id, poll in zip(ids, polls):
+                    try:
+                        if not poll.result():
+                            continue
+                        error = None
+                    except (requests.RequestException, ValueError) as e:
+                        error = e
+                    contract = pending.pop(verification_id)
+                    yield BatchVerificationResult(contract, verification_id, error)
+
+                if not (submitting or pending):
+                    return
+                if datetime.now() >= deadline:
+                    break
+                if not pending:
+                    # nothing to poll, the backoff starts again with the next one
+                    remaining = (deadline - datetime.now()).total_seconds()
+                    wait(submitting, max(remaining, 0), FIRST_COMPLETED)
+                    wait_time = self.backoff
+                    continue
+                time.sleep(wait_time.total_seconds())
+                wait_time *= self.backoff_factor
+
+            error = TimeoutError("Timeout waiting for verification to complete")
+            for verification_id, contract in pending.items():
+                yield BatchVerificationResult(contract, verification_id, error)
+            for future, contract in submitting.items():
+                future.cancel()
+                yield BatchVerificationResult(contract, None, error)
+
+    @cached_property
+    def session(self) -> requests.Session:
+        """The HTTP session of all requests, so connections to the explorer are reused."""
+        return requests.Session()
+
+    def _submit(
+        self,
+        address: Address,
+        contract_name: str,
+        solc_json: dict,
+        constructor_calldata: bytes,
+    ) -> str:
+        """
+        Submits a contract for verification.
+        :return: The ID of the contract verification.
+        """
         url = f"{self.uri}/contract_verification"
 
         body = {
@@ -67,16 +174,15 @@ class ZksyncExplorer:
             # hardcoded in hardhat for some reason: https://github.com/matter-labs/hardhat-zksync/blob/187722e/packages/hardhat-zksync-verify-vyper/src/task-actions.ts#L110  # noqa: E501
         }
 
-        response = requests.post(url, json=body)
+        response = self.session.post(
+            url,
+            data=get_json_codec().dumps(body),
+            headers={"Content-Type": "application/json"},
+        )
         response.raise_for_status()
         verification_id = response.text
         int(verification_id)  # raises ValueError if not an int
-
-        if not wait:
-            return VerificationResult(verification_id, self)  # type: ignore
-
-        self.wait_for_verification(verification_id)
-        return None
+        return verification_id
 
     @staticmethod
     def _extract_version(version: str):
@@ -104,13 +210,13 @@ class ZksyncExplorer:
     def is_verified(self, verification_id: str) -> bool:
         url = f"{self.uri}/contract_verification/{verification_id}"
 
-        response = requests.get(url)
+        response = self.session.get(url)
         if response.status_code in self.retry_http_codes:
             return False
         response.raise_for_status()
 
         # known statuses: successful, failed, queued, in_progress
-        json = response.json()
+        json = get_json_codec().loads(response.content)
         if json["status"] == "failed":
             raise ValueError(f"Verification failed: {json['error']}")
         return json["status"] == "successful"
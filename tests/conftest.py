@@ -8,6 +8,8 @@ from eth_account import Account
 import boa_zksync
 from boa_zksync import AnvilZKsync
 from boa_zksync.deployer import ZksyncDeployer
+from boa_zksync.environment import ZksyncEnv
+from boa_zksync.mock_node import MockZksyncNode
 
 STARTING_SUPPLY = 100
 ZKSYNC_SEPOLIA_RPC_URL = os.getenv(
@@ -19,9 +21,10 @@ ZKSYNC_SEPOLIA_EXPLORER_URL = os.getenv(
 
 
 @pytest.fixture(scope="module")
-def zksync_env(account):
+def zksync_env(zksync_node, account):
     old_env = boa.env
-    boa_zksync.set_zksync_test_env()
+    # one node per xdist worker, the anchors revert the changes of each module
+    boa.set_env(ZksyncEnv(zksync_node))
     boa.env.add_account(account, force_eoa=True)
     yield boa.env
     boa.set_env(old_env)
@@ -101,3 +104,17 @@ def zksync_deployer(zksync_env_with_db) -> ZksyncDeployer:
     from tests.data import Counter
 
     return Counter
+
+
+@pytest.fixture
+def mock_node() -> MockZksyncNode:
+    return MockZksyncNode()
+
+
+@pytest.fixture
+def mock_env(mock_node) -> ZksyncEnv:
+    """An env on the mock node, with a funded account."""
+    env = ZksyncEnv(mock_node)
+    env.add_account(Account.create(), force_eoa=True)
+    env.set_balance(env.eoa, 10**18)
+    return env
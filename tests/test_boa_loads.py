@@ -4,6 +4,7 @@ from boa import BoaError
 from boa.contracts.base_evm_contract import StackTrace
 from boa.contracts.call_trace import TraceFrame
 
+import boa_zksync
 from tests.conftest import STARTING_SUPPLY
 
 
@@ -88,7 +89,7 @@ def bar() -> uint256:
     assert contract.bar() == 123
 
 
-def test_stack_trace(zksync_env):
+def _deploy_stack_trace_contracts():
     called_contract = boa.loads(
         """
 @internal
@@ -117,10 +118,48 @@ def get_name_of(addr: HasName) -> String[32]:
         name="CallerContract",
     )
 
+    return called_contract, caller_contract
+
+
+def test_stack_trace(zksync_env):
+    called_contract, caller_contract = _deploy_stack_trace_contracts()
+
     # boa.reverts does not give us the stack trace, use pytest.raises instead
     with pytest.raises(BoaError) as ctx:
         caller_contract.get_name_of(called_contract)
 
+    (call_trace, stack_trace) = ctx.value.args
+    called_addr = called_contract.address
+    caller_frame = (
+        f"  Test an error(<CallerContract interface at {caller_contract.address}> "
+        "(file <unknown>).get_name_of(address) -> ['string'])"
+    )
+    assert stack_trace == StackTrace(
+        [
+            "  Test an error(<CalledContract interface at "
+            f"{called_addr}> (file <unknown>).name() -> ['string'])",
+            caller_frame,
+            caller_frame,
+        ]
+    )
+    assert isinstance(call_trace, TraceFrame)
+    assert str(call_trace).split("\n") == [
+        f'[E] [21307] CallerContract.get_name_of(addr = "{called_addr}") <0x>',
+        f'    [E] [1355] CallerContract.get_name_of(addr = "{called_addr}") <0x>',
+        "        [E] [397] CalledContract.name() <0x>",
+    ]
+
+
+def test_stack_trace_system_frames(zksync_env):
+    called_contract, caller_contract = _deploy_stack_trace_contracts()
+
+    zksync_env.keep_system_frames = True
+    try:
+        with pytest.raises(BoaError) as ctx:
+            caller_contract.get_name_of(called_contract)
+    finally:
+        zksync_env.keep_system_frames = False
+
     (call_trace, stack_trace) = ctx.value.args
     called_addr = called_contract.address
     assert stack_trace == StackTrace(
@@ -224,3 +263,21 @@ def get_time() -> uint256:
     assert contract.get_time() == boa.env.vm.state.timestamp
     boa.env.vm.state.timestamp = 1234567890
     assert contract.get_time() == 1234567890
+
+
+def test_dump_and_load_state(zksync_env, tmp_path):
+    code = """
+val: public(uint256)
+
+@deploy
+def __init__(val: uint256):
+    self.val = val
+"""
+    contract = boa.loads(code, 42)
+    boa.env.dump_state(tmp_path / "state.json")
+
+    with boa.swap_env(boa.env):
+        boa_zksync.set_zksync_test_env(state=tmp_path / "state.json")
+        restored = boa.env.lookup_contract(contract.address)
+        assert restored.val() == 42
+        assert restored.compiler_data.bytecode == contract.compiler_data.bytecode
@@ -0,0 +1,76 @@
+import pytest
+from boa.rpc import RPCError
+
+from boa_zksync.cassette import CassetteMissError, CassetteRPC
+from boa_zksync.environment import ZksyncEnv
+from boa_zksync.mock_node import MockZksyncNode
+
+ADDRESS = "0x" + "Ab" * 20
+CALL = ("eth_call", [{"to": ADDRESS}, "latest"])
+
+
+def test_record_and_replay(tmp_path, mock_node):
+    path = tmp_path / "cassette.json.gz"
+    mock_node.state.code[ADDRESS.lower()] = "0x1234"
+    mock_node.mock_call(ADDRESS, revert="paused")
+    with CassetteRPC(path, mock_node, mode="record") as rpc:
+        assert rpc.fetch("eth_blockNumber", []) == "0x0"
+        rpc.fetch("evm_mine", [])
+        assert rpc.fetch("eth_blockNumber", []) == "0x1"
+        assert rpc.fetch("eth_getCode", [ADDRESS, "latest"]) == "0x1234"
+        with pytest.raises(RPCError) as e:
+            rpc.fetch(*CALL)
+        assert str(e.value) == "3: execution reverted: paused"
+
+    rpc = CassetteRPC(path)
+    # repeated requests are replayed in order, and the last response repeats
+    assert [rpc.fetch("eth_blockNumber", []) for _ in range(3)] == ["0x0", "0x1", "0x1"]
+    # addresses are normalized
+    assert rpc.fetch("eth_getCode", [ADDRESS.lower(), "latest"]) == "0x1234"
+    with pytest.raises(RPCError) as e:
+        rpc.fetch(*CALL)
+    assert (e.value.code, str(e.value)) == (3, "3: execution reverted: paused")
+    with pytest.raises(CassetteMissError):
+        rpc.fetch("eth_getCode", [ADDRESS, "0x10"])
+    assert (rpc.hits, rpc.misses) == (5, 1)
+    assert len(mock_node.requests) == 5
+
+
+def test_passthrough(tmp_path, mock_node):
+    path = tmp_path / "cassette.json.gz"
+    with CassetteRPC(path, mock_node, mode="record") as rpc:
+        rpc.fetch("eth_chainId", [])
+
+    upstream = MockZksyncNode(chain_id=1, gas_price=7)
+    with CassetteRPC(path, upstream, mode="passthrough") as rpc:
+        # only the missing request of the batch is forwarded
+        payloads = [("eth_chainId", []), ("eth_gasPrice", [])]
+        assert rpc.fetch_multi(payloads) == [hex(mock_node.chain_id), "0x7"]
+    assert upstream.methods == ["eth_gasPrice"]
+
+    rpc = CassetteRPC(path)
+    assert rpc.fetch_multi(payloads[::-1]) == ["0x7", hex(mock_node.chain_id)]
+
+
+def test_failed_batches(tmp_path, mock_node):
+    mock_node.mock_call(ADDRESS, revert="paused")
+    with CassetteRPC(tmp_path / "cassette.json.gz", mock_node, mode="record") as rpc:
+        # read-only requests are sent again, to find the one that failed
+        with pytest.raises(RPCError):
+            rpc.fetch_multi([("eth_blockNumber", []), CALL])
+        assert mock_node.methods == ["eth_blockNumber", "eth_call"] * 2
+
+        # but not requests that change the state
+        with pytest.raises(RPCError, match="paused"):
+            rpc.fetch_multi([("evm_mine", []), CALL])
+        assert mock_node.methods[4:] == ["evm_mine", "eth_call"]
+        assert mock_node.state.block_number == 1
+
+
+def test_replay_env(tmp_path, mock_node):
+    path = tmp_path / "cassette.json.gz"
+    mock_node.state.balances[ADDRESS.lower()] = 10**18
+    with CassetteRPC(path, mock_node, mode="record") as rpc:
+        assert ZksyncEnv(rpc).get_balance(ADDRESS) == 10**18
+
+    assert ZksyncEnv(CassetteRPC(path)).get_balance(ADDRESS) == 10**18
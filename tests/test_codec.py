@@ -0,0 +1,37 @@
+import pytest
+from boa.util.abi import Address
+
+from boa_zksync.codec import JSON_CODECS, get_json_codec, set_json_codec
+
+
+@pytest.mark.parametrize("name", JSON_CODECS)
+def test_codec_roundtrip(name):
+    payload = {"jsonrpc": "2.0", "params": [{"factoryDeps": [[1, 2, 255]]}], "id": 0}
+    codec = JSON_CODECS[name]
+    encoded = codec.dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == payload
+
+
+@pytest.mark.parametrize("name", JSON_CODECS)
+def test_codec_address_keys(name):
+    address = Address("0x0000000000000000000000000000000000008006")
+    payload = {address: {"balance": "0x1"}, "to": address}
+    assert JSON_CODECS[name].loads(JSON_CODECS[name].dumps(payload)) == {
+        str(address): {"balance": "0x1"},
+        "to": str(address),
+    }
+
+
+def test_set_json_codec():
+    previous = set_json_codec("json")
+    try:
+        assert get_json_codec().name == "json"
+    finally:
+        set_json_codec(previous.name)
+    assert get_json_codec() == previous
+
+
+def test_set_unknown_json_codec():
+    with pytest.raises(ValueError, match="JSON codec simplejson is not available"):
+        set_json_codec("simplejson")
@@ -52,3 +52,49 @@ def test_from_debug_trace_production_mode():
         **_required_fields,
     }
     assert ZksyncComputation.from_debug_trace(boa.env, output).output == result
+
+
+def test_from_call_trace_collapses_system_frames():
+    sender = boa.env.generate_address()
+    to = boa.env.generate_address()
+    inner = boa.env.generate_address()
+    system_contract = "0x0000000000000000000000000000000000008009"
+    output = {
+        "from": sender,
+        "to": to,
+        "output": "0x",
+        "calls": [
+            {
+                "from": to,
+                "to": "0x000000000000000000000000000000000000800b",
+                "output": "0x",
+                "calls": [],
+                **_required_fields,
+            },
+            {
+                "from": to,
+                "to": system_contract,
+                "output": "0x",
+                "calls": [
+                    {
+                        "from": system_contract,
+                        "to": inner,
+                        "output": "0x",
+                        "calls": [],
+                        **_required_fields,
+                    }
+                ],
+                **_required_fields,
+            },
+        ],
+        **_required_fields,
+    }
+
+    computation = ZksyncComputation.from_call_trace(boa.env, output)
+    assert [child.msg.to for child in computation.children] == [inner]
+
+    computation = ZksyncComputation.from_call_trace(
+        boa.env, output, keep_system_frames=True
+    )
+    assert len(computation.children) == 2
+    assert computation.children[1].children[0].msg.to == inner
@@ -1,6 +1,37 @@
+from collections import OrderedDict
+
+import boa
+import pytest
+import vyper
+from boa import interpret
 from boa.deployments import get_deployments_db
+from boa.interpret import compiler_data
+from boa.rpc import to_hex
+from boa.util.disk_cache import DiskCache
+from packaging.version import Version
 
+import boa_zksync.deployer as deployer_module
 from boa_zksync.contract import ZksyncContract
+from boa_zksync.deployer import ZksyncDeployer
+from boa_zksync.environment import ZksyncEnv
+from boa_zksync.types import ZksyncCompilerData
+
+CODE = """
+event Ping:
+    value: uint256
+
+@external
+@view
+def get(x: uint256) -> uint256:
+    return x
+
+@external
+@view
+def get_pair(x: uint256, y: uint256) -> uint256:
+    return x + y
+"""
+
+BYTECODE = b"\x01" * 32
 
 
 def test_deployer_deploys(zksync_deployer):
@@ -22,3 +53,138 @@ def test_multiple_deploys(zksync_deployer):
     zksync_deployer.deploy()
     zksync_deployer.deploy()
     assert len(list(db.get_deployments())) == 4 + initial_count
+
+
+@pytest.fixture
+def code_env(mock_node):
+    mock_node.state.code[f"0x{1:040x}"] = to_hex(BYTECODE)
+    env = ZksyncEnv(mock_node)
+    with boa.swap_env(env):
+        yield env
+
+
+def _zkvyper_data(source_code: str) -> ZksyncCompilerData:
+    # use the ABI from vyper, without running zkvyper
+    return ZksyncCompilerData(
+        contract_name="Pinger",
+        source_code=source_code,
+        zkvyper_version=Version("1.5.10"),
+        compiler_args=[],
+        bytecode=BYTECODE,
+        method_identifiers={},
+        abi=vyper.compile_code(source_code, output_formats=["abi"])["abi"],
+        bytecode_runtime="",
+        warnings=[],
+        factory_deps=[],
+    )
+
+
+@pytest.fixture
+def deployer(code_env):
+    zkvyper_data = _zkvyper_data(CODE)
+    return ZksyncDeployer(zkvyper_data.vyper, zkvyper_data=zkvyper_data)
+
+
+@pytest.fixture
+def compilations(monkeypatch):
+    compilations = []
+
+    def compile(compiler_data, contract_name, filename, compiler_args=None):
+        compilations.append(compiler_data.file_input.source_code)
+        return _zkvyper_data(compiler_data.file_input.source_code)
+
+    monkeypatch.setattr(ZksyncDeployer, "_compile", staticmethod(compile))
+    monkeypatch.setattr(deployer_module, "_get_zkvyper_version", lambda: "v1.5.10")
+    monkeypatch.setattr(deployer_module, "_deployers", OrderedDict())
+    monkeypatch.setattr(deployer_module, "DEPLOYER_CACHE_SIZE", 2)
+    monkeypatch.setattr(interpret, "_disk_cache", None)
+    return compilations
+
+
+def test_attach_makes_no_requests(code_env, mock_node, deployer):
+    contracts = [deployer.at(f"0x{i:040x}") for i in range(1, 1001)]
+    assert mock_node.requests == []
+    assert code_env._contracts == {}
+    assert contracts[0].address == f"0x{1:040x}"
+    assert isinstance(contracts[0], ZksyncContract)
+
+
+def test_attach_shares_abi(deployer):
+    first, second = deployer.at(f"0x{1:040x}"), deployer.at(f"0x{2:040x}")
+    assert first.method_id_map is second.method_id_map
+    assert first.event_for is second.event_for
+    assert first.event_index is second.event_index
+    assert first.get.contract is first and second.get.contract is second
+    assert first.get.method_id is second.get.method_id
+    assert first.get_pair.argument_types is second.get_pair.argument_types
+
+
+def test_attach_registers_on_first_use(code_env, deployer):
+    contract = deployer.at(f"0x{1:040x}")
+    assert contract.address.canonical_address not in code_env._contracts
+    assert contract.get.prepare_calldata(5)[4:] == (5).to_bytes(32, "big")
+    assert code_env._contracts[contract.address.canonical_address] is contract
+    assert code_env.lookup_code(contract.compiler_data.bytecode_hash) is contract
+
+
+def test_attach_fetches_bytecode_lazily(mock_node, deployer):
+    contract = deployer.at(f"0x{1:040x}")
+    assert "interface at" in repr(contract)
+    assert mock_node.requests == []
+    assert contract._bytecode == to_hex(BYTECODE)
+    assert mock_node.methods == ["eth_getCode"]
+    with pytest.raises(AttributeError, match="no attribute 'missing'"):
+        contract.missing
+
+
+def test_attach_needs_zksync_env(deployer):
+    with boa.swap_env(boa.Env()):
+        with pytest.raises(AssertionError, match="zkSync environments"):
+            ZksyncContract.attach(
+                deployer.zkvyper_data, "Pinger", deployer.contract_abi, f"0x{1:040x}"
+            )
+
+
+def test_deployers_are_memoized(compilations):
+    first = ZksyncDeployer(compiler_data(CODE, None, "<unknown>"))
+    assert ZksyncDeployer(compiler_data(CODE, None, "<unknown>")) is first
+    assert compilations == [CODE]
+
+    other_code = CODE.replace("x + y", "x * y")
+    other = ZksyncDeployer(compiler_data(other_code, None, "<unknown>"))
+    assert other is not first
+    assert compilations == [CODE, other_code]
+
+
+def test_deployer_cache_is_bounded(compilations):
+    sources = [CODE.replace("x + y", f"x + y + {i}") for i in range(3)]
+    for source in sources:
+        ZksyncDeployer(compiler_data(source, None, "<unknown>"))
+    assert len(deployer_module._deployers) == 2
+
+    # the least recently used source was evicted, so it compiles again
+    ZksyncDeployer(compiler_data(sources[0], None, "<unknown>"))
+    assert compilations == sources + sources[:1]
+
+
+def test_compilations_are_shared_on_disk(compilations, monkeypatch, tmp_path):
+    monkeypatch.setattr(interpret, "_disk_cache", DiskCache(tmp_path, "test"))
+    first = ZksyncDeployer(compiler_data(CODE, None, "<unknown>"))
+
+    # e.g. another pytest-xdist worker, without the memoized deployers
+    monkeypatch.setattr(deployer_module, "_deployers", OrderedDict())
+    second = ZksyncDeployer(compiler_data(CODE, None, "<unknown>"))
+    assert second is not first
+    assert second.zkvyper_data == first.zkvyper_data
+    assert compilations == [CODE]
+
+
+def test_deployers_depend_on_imports(compilations, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    source = "import lib\n\n@external\ndef get() -> uint256:\n    return lib.VALUE\n"
+    (tmp_path / "lib.vy").write_text("VALUE: constant(uint256) = 1\n")
+    first = ZksyncDeployer(compiler_data(source, None, "<unknown>"))
+
+    (tmp_path / "lib.vy").write_text("VALUE: constant(uint256) = 2\n")
+    assert ZksyncDeployer(compiler_data(source, None, "<unknown>")) is not first
+    assert compilations == [source, source]
@@ -0,0 +1,351 @@
+from threading import Lock
+
+import pytest
+from boa.rpc import RPC, RPCError
+from boa.util.abi import Address
+
+from boa_zksync import environment
+from boa_zksync.contract import ContractABI, ZksyncBlueprint, ZksyncContract, ZksyncEval
+from boa_zksync.environment import ZksyncEnv
+from boa_zksync.mock_node import MockZksyncNode
+from boa_zksync.rpc import ZksyncRPC
+from boa_zksync.types import ZksyncCompilerData
+
+
+class _LogsRPC(RPC):
+    """Serves one log per block, and rejects queries over `max_range` blocks."""
+
+    def __init__(self, max_range: int):
+        self.max_range = max_range
+        self.queries = []
+
+    @property
+    def name(self):
+        return "logs"
+
+    def fetch(self, method, params):
+        if method == "eth_getBlockByNumber":
+            return {"number": "0x63"}  # 99
+        assert method == "eth_getLogs"
+        start, end = int(params[0]["fromBlock"], 16), int(params[0]["toBlock"], 16)
+        self.queries.append((start, end))
+        if end - start + 1 > self.max_range:
+            raise RPCError("query exceeds max block range", -32602)
+        return [{"blockNumber": hex(block)} for block in range(start, end + 1)]
+
+
+def test_fetch_logs_in_order():
+    rpc = _LogsRPC(max_range=100)
+    env = ZksyncEnv(rpc)
+    logs = env.fetch_logs(10, chunk_size=7, max_workers=3)
+    assert [int(log["blockNumber"], 16) for log in logs] == list(range(10, 100))
+    assert sorted(rpc.queries)[:2] == [(10, 16), (17, 23)]
+
+
+def test_fetch_logs_shrinks_chunks():
+    rpc = _LogsRPC(max_range=10)
+    env = ZksyncEnv(rpc)
+    logs = env.fetch_logs(0, 99, chunk_size=40, max_workers=1)
+    assert [int(log["blockNumber"], 16) for log in logs] == list(range(100))
+    assert rpc.queries[:4] == [(0, 39), (0, 19), (0, 9), (10, 19)]
+    # chunks created after the split use the smaller size
+    assert rpc.queries[-2:] == [(80, 89), (90, 99)]
+
+
+def test_fetch_logs_other_errors():
+    class _FailingRPC(_LogsRPC):
+        def fetch(self, method, params):
+            raise RPCError("internal error", -32603)
+
+    with pytest.raises(RPCError, match="internal error"):
+        list(ZksyncEnv(_FailingRPC(10)).fetch_logs(0, 99))
+
+
+def _compiler_data() -> ZksyncCompilerData:
+    abi = [
+        {
+            "type": "function",
+            "name": "get",
+            "inputs": [],
+            "outputs": [{"name": "", "type": "uint256"}],
+            "stateMutability": "view",
+        }
+    ]
+    return ZksyncCompilerData(
+        contract_name="Getter",
+        source_code="",
+        zkvyper_version="v1.5.10",  # as read from `zkvyper --version`
+        compiler_args=[],
+        bytecode=b"\x01" * 32,
+        method_identifiers={},
+        abi=abi,
+        bytecode_runtime="",
+        warnings=[],
+        factory_deps=[],
+    )
+
+
+def test_dump_and_load_state(tmp_path, mock_node):
+    env = ZksyncEnv(mock_node)
+    env.set_balance(f"0x{3:040x}", 1234)
+    data = _compiler_data()
+    contract_abi = ContractABI("Getter", data.abi)
+    for i, contract_class in enumerate((ZksyncContract, ZksyncBlueprint)):
+        address = f"0x{i + 1:040x}"
+        contract = contract_class.attach(data, "Getter", contract_abi, address, env)
+        contract._ensure_registered()
+    env.dump_state(tmp_path / "state.json")
+
+    new_env = ZksyncEnv(MockZksyncNode())
+    contracts = new_env.load_state(tmp_path / "state.json")
+    assert new_env.get_balance(f"0x{3:040x}") == 1234
+    assert [type(c) for c in contracts] == [ZksyncContract, ZksyncBlueprint]
+    assert [c.address for c in contracts] == [f"0x{1:040x}", f"0x{2:040x}"]
+    assert contracts[0].env is new_env
+    assert new_env.lookup_contract(contracts[0].address) is contracts[0]
+    assert contracts[0].compiler_data == data
+    assert contracts[0].get.method_id == bytes.fromhex("6d4ce63c")
+
+
+def test_anchor_without_changes(mock_node):
+    env = ZksyncEnv(mock_node)
+    with env.anchor():
+        with env.anchor():
+            pass
+    assert mock_node.methods == []
+
+
+def test_nested_anchors_share_snapshot(mock_node):
+    env = ZksyncEnv(mock_node)
+    address = f"0x{1:040x}"
+    with env.anchor():
+        with env.anchor():
+            with env.anchor():
+                env.set_balance(address, 1)
+                assert mock_node.methods == ["evm_snapshot", "hardhat_setBalance"]
+            env.set_balance(address, 2)
+        env.set_balance(address, 3)
+    assert mock_node.methods == [
+        "evm_snapshot",
+        "hardhat_setBalance",
+        "evm_revert",
+        # the outer anchors take a new snapshot after the revert
+        "evm_snapshot",
+        "hardhat_setBalance",
+        "evm_revert",
+        "evm_snapshot",
+        "hardhat_setBalance",
+        "evm_revert",
+    ]
+
+
+def test_anchor_reverts_on_error(mock_node):
+    env = ZksyncEnv(mock_node)
+    data = _compiler_data()
+    contract_abi = ContractABI("Getter", data.abi)
+    before = ZksyncContract.attach(data, "Getter", contract_abi, f"0x{1:040x}", env)
+    before._ensure_registered()
+    attached = ZksyncContract.attach(data, "Getter", contract_abi, f"0x{2:040x}", env)
+
+    with pytest.raises(ValueError, match="test failed"):
+        with env.anchor():
+            env.last_receipt = {"logs": []}
+            attached._ensure_registered()
+            inside = ZksyncContract.attach(
+                data, "Getter", contract_abi, f"0x{3:040x}", env
+            )
+            inside._ensure_registered()
+            env.set_code(f"0x{3:040x}", data.bytecode)
+            raise ValueError("test failed")
+
+    assert mock_node.methods == ["evm_snapshot", "hardhat_setCode", "evm_revert"]
+    assert env.last_receipt is None
+    assert list(env._contracts) == [before.address.canonical_address]
+    # the bytecode registry points to the contract registered before the anchor
+    assert env.lookup_code(data.bytecode_hash) is before
+    # contracts attached before the anchor are registered again when used
+    attached._ensure_registered()
+    assert env.lookup_contract(attached.address) is attached
+
+
+def test_anchor_reverts_time(mock_node):
+    env = ZksyncEnv(mock_node)
+    with env.anchor():
+        env.vm.state.timestamp = 1234567890
+    assert mock_node.methods == ["evm_snapshot", "evm_setTime", "evm_revert"]
+
+
+class _ForkNode(RPC):
+    """Stands in for the fork nodes of a pool."""
+
+    def __init__(self, url: str, block_identifier):
+        self.url, self.block_identifier = url, block_identifier
+        self.stopped = False
+
+    @property
+    def name(self):
+        return "fork"
+
+    def stop(self):
+        self.stopped = True
+
+
+class _ForkPool:
+    def __init__(self):
+        self.started = []
+        self.released = []
+
+    def acquire(self, rpc, block_identifier, node_args=()):
+        self.started.append(_ForkNode(rpc._rpc_url, block_identifier))
+        return self.started[-1]
+
+    def release(self, node):
+        self.released.append(node)
+
+
+def test_switch_forks(monkeypatch):
+    monkeypatch.setattr(environment, "FORK_CACHE_SIZE", 2)
+    env, pool = ZksyncEnv(MockZksyncNode()), _ForkPool()
+    mainnet, sepolia = ZksyncRPC("http://mainnet"), ZksyncRPC("http://sepolia")
+
+    env.fork_rpc(mainnet, block_identifier=1, pool=pool)
+    mainnet_node = env._rpc
+    env.fork_rpc(sepolia, block_identifier=1, pool=pool)
+    assert env._rpc is not mainnet_node
+    env.fork_rpc(mainnet, block_identifier=1, pool=pool)
+    assert env._rpc is mainnet_node
+    assert len(pool.started) == 2
+
+    # the least recently used fork is returned to its pool
+    env.fork_rpc(mainnet, block_identifier=2, pool=pool)
+    assert pool.released == [pool.started[1]]
+
+    # a new node replaces the running one
+    env.fork_rpc(mainnet, block_identifier=1, pool=pool, reuse=False)
+    assert pool.released[-1] is mainnet_node
+    assert env._rpc is pool.started[-1]
+    assert not any(node.stopped for node in pool.started)
+
+
+def test_fork_tags_start_new_nodes():
+    env, pool = ZksyncEnv(MockZksyncNode()), _ForkPool()
+    mainnet = ZksyncRPC("http://mainnet")
+
+    env.fork_rpc(mainnet, block_identifier="safe", pool=pool)
+    first = env._rpc
+    # "safe" is a newer block now
+    env.fork_rpc(mainnet, block_identifier="safe", pool=pool)
+    assert env._rpc is not first and pool.released == [first]
+    env.fork_rpc(mainnet, block_identifier="safe", pool=pool, reuse=True)
+    assert env._rpc is pool.started[-1]
+    assert len(pool.started) == 2
+
+
+class _CachedForkNode(_ForkNode):
+    def __init__(self, rpc, block_identifier, rpc_cache=False):
+        super().__init__(rpc._rpc_url, block_identifier)
+        self.rpc_cache = rpc_cache
+
+
+def test_fork_with_rpc_cache(monkeypatch):
+    monkeypatch.setattr(environment, "AnvilZKsync", _CachedForkNode)
+    env, pool = ZksyncEnv(MockZksyncNode()), _ForkPool()
+    mainnet = ZksyncRPC("http://mainnet")
+
+    env.fork_rpc(mainnet, block_identifier=1, pool=pool)
+    pooled = env._rpc
+    # the nodes of the pool don't use the cache, so a new node is started
+    env.fork_rpc(mainnet, block_identifier=1, pool=pool, rpc_cache=True)
+    cached = env._rpc
+    assert cached.rpc_cache and len(pool.started) == 1
+    env.fork_rpc(mainnet, block_identifier=1, pool=pool)
+    assert env._rpc is pooled
+
+    # the node started by the env is stopped, instead of released to the pool
+    env.fork_rpc(mainnet, block_identifier=1, pool=pool, rpc_cache=True, reuse=False)
+    assert cached.stopped and pool.released == []
+
+
+class _PrefetchRPC(MockZksyncNode):
+    """Records the batches of requests."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self._batches_lock = Lock()
+
+    def fetch_multi(self, payloads):
+        with self._batches_lock:
+            self.batches.append(payloads)
+        return super().fetch_multi(payloads)
+
+
+def test_prefetch():
+    env = ZksyncEnv(_PrefetchRPC())
+    accounts = [f"0x{i:040x}" for i in range(1, 11)]
+    stats = env.prefetch(accounts, slots={accounts[0]: [0, 1], accounts[-1]: [5]})
+    assert (stats.accounts, stats.slots) == (10, 3)
+    reads = [read for batch in env._rpc.batches for read in batch]
+    assert len(reads) == 33 and stats.requests == len(env._rpc.batches) == 3
+    assert ("eth_getCode", [accounts[0], "latest"]) in reads
+    assert ("eth_getStorageAt", [Address(accounts[-1]), "0x5", "latest"]) in reads
+    assert stats.reads_per_second > 0
+
+
+def test_eval_registers_vyper_contract(mock_node):
+    source = "bar: uint256\n"
+    data = ZksyncCompilerData(
+        "Bar", source, "v1.5.10", [], bytes(32), {}, [], "", [], []
+    )
+    env = ZksyncEnv(mock_node)
+    address = Address("0x" + "01" * 20)
+    contract = ZksyncContract.attach(data, "Bar", ContractABI("Bar", []), address, env)
+
+    # the vyper contract used to evaluate code has no zkSync compiler data
+    evaluated = ZksyncEval("self.bar", contract)
+    assert evaluated._abi["outputs"] == [{"name": "eval", "type": "uint256"}]
+    assert env._unresolved_code[address] is contract.vyper_contract
+
+
+def test_simulate_sends_no_transaction(mock_env, mock_node):
+    to = "0x" + "12" * 20
+    mock_node.mock_call(to, b"\x01")
+
+    # ABI functions called with `simulate=True`
+    computation = mock_env.execute_code(to, is_modifying=True, simulate=True)
+    assert computation.output == b"\x01"
+    assert "eth_sendRawTransaction" not in mock_node.methods
+
+
+class _OverrideRPC(RPC):
+    """Applies balance overrides in `eth_call`, and optionally in traced calls."""
+
+    def __init__(self, trace: str):
+        self.trace = trace  # "overrides", "ignores" or "unavailable"
+
+    @property
+    def name(self):
+        return "overrides"
+
+    def fetch(self, method, params):
+        if method == "debug_traceCall":
+            if self.trace == "unavailable":
+                raise RPCError("Method not found", -32601)
+            overrides = (
+                params[2].get("stateOverrides") if self.trace == "overrides" else {}
+            )
+            return {"output": self._balance(overrides)}
+        assert method == "eth_call"
+        return self._balance(params[2])
+
+    @staticmethod
+    def _balance(overrides):
+        balance = next(iter(overrides.values()), {}).get("balance", "0x0")
+        return "0x" + balance.removeprefix("0x").rjust(64, "0")
+
+
+@pytest.mark.parametrize(
+    "trace,expected", [("overrides", True), ("ignores", False), ("unavailable", True)]
+)
+def test_state_override_probe(trace, expected):
+    assert ZksyncEnv(_OverrideRPC(trace))._rpc_has_state_override is expected
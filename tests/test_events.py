@@ -0,0 +1,108 @@
+import boa
+import pytest
+from boa.contracts.event_decoder import RawLogEntry
+from vyper.utils import keccak256
+
+from boa_zksync import events
+from boa_zksync.events import EventIndex, get_event_index, to_raw_log_entry
+
+CODE = """
+struct Point:
+    x: int128
+    y: address
+
+event Transfer:
+    sender: indexed(address)
+    receiver: indexed(address)
+    amount: uint256
+
+event Note:
+    tag: String[10]
+    point: Point
+    values: DynArray[uint256, 3]
+    memo: Bytes[40]
+
+event Tagged:
+    tag: indexed(String[10])
+
+@external
+def emit_tagged():
+    log Tagged(tag="a tag")
+
+@external
+def emit_all():
+    log Transfer(sender=msg.sender, receiver=self, amount=10)
+    log Note(tag="a tag", point=Point(x=-1, y=self), values=[1, 2], memo=b"memo")
+"""
+
+
+@pytest.fixture(scope="module")
+def pyevm_contract():
+    # compare with the logs decoded by boa, from the vyper source
+    with boa.swap_env(boa.Env()):
+        contract = boa.loads(CODE)
+        yield contract
+
+
+def _raw_logs(contract):
+    entries = sorted(contract._get_logs(contract._computation, True))
+    return [RawLogEntry(*entry) for entry in entries]
+
+
+def test_decode_matches_boa(pyevm_contract):
+    pyevm_contract.emit_all()
+    index = EventIndex(pyevm_contract.abi)
+    raw_logs = _raw_logs(pyevm_contract)
+    assert [index.decode(log) for log in raw_logs] == pyevm_contract.get_logs()
+
+
+def test_decode_indexed_string(pyevm_contract):
+    # boa can't decode these, the topic is the hash of the value
+    pyevm_contract.emit_tagged()
+    (log,) = _raw_logs(pyevm_contract)
+    decoded = EventIndex(pyevm_contract.abi).decode(log)
+    assert decoded.tag == keccak256(b"a tag")
+    assert decoded.address == pyevm_contract.address
+
+
+def test_decode_unknown_event(pyevm_contract):
+    pyevm_contract.emit_all()
+    index = EventIndex([])
+    with pytest.raises(ValueError, match="can't find event"):
+        index.decode(_raw_logs(pyevm_contract)[0])
+
+
+def test_topics(pyevm_contract):
+    pyevm_contract.emit_all()
+    index = EventIndex(pyevm_contract.abi)
+    raw_logs = _raw_logs(pyevm_contract)
+    assert index.topics == {
+        "Transfer": raw_logs[0].topics[0],
+        "Note": raw_logs[1].topics[0],
+        "Tagged": int.from_bytes(keccak256(b"Tagged(string)"), "big"),
+    }
+
+
+def test_event_index_is_shared(pyevm_contract):
+    index = get_event_index(b"\x01" * 32, pyevm_contract.abi)
+    assert get_event_index(b"\x01" * 32, []) is index
+
+
+def test_to_raw_log_entry():
+    log = {
+        "address": "0x" + "ab" * 20,
+        "topics": ["0x" + "00" * 31 + "05"],
+        "data": "0x1234",
+        "logIndex": "0x2",
+    }
+    assert to_raw_log_entry(log) == RawLogEntry(2, b"\xab" * 20, [5], b"\x12\x34")
+
+
+def test_event_indexes_are_bounded(monkeypatch):
+    monkeypatch.setattr(events, "EVENT_INDEX_CACHE_SIZE", 2)
+    first = get_event_index(b"\x02" * 32, [])
+    get_event_index(b"\x03" * 32, [])
+    assert get_event_index(b"\x02" * 32, []) is first  # the most recently used
+    get_event_index(b"\x04" * 32, [])
+    assert b"\x03" * 32 not in events._event_indexes
+    assert get_event_index(b"\x02" * 32, []) is first
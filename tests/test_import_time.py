@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+# imported by the modules of the package, but not by boa itself
+HEAVY_MODULES = ("orjson", "http.server")
+
+
+def _run_python(*args: str) -> str:
+    result = subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True
+    )
+    return result.stdout + result.stderr
+
+
+def _imported_modules(code: str) -> list[str]:
+    """The modules imported after running the code, in a fresh interpreter."""
+    return _run_python("-c", f"import sys; {code}; print(*sorted(sys.modules))").split()
+
+
+def test_import_is_lazy():
+    modules = _imported_modules("import boa_zksync")
+    assert [m for m in modules if m.startswith("boa_zksync")] == ["boa_zksync"]
+    assert not set(HEAVY_MODULES) & set(modules)
+
+
+def test_contract_deployer_abi_is_lazy():
+    output = _run_python(
+        "-c",
+        "import boa_zksync.environment as env; "
+        "print(env._load_contract_deployer.cache_info().currsize)",
+    )
+    assert output.split() == ["0"]
@@ -0,0 +1,73 @@
+import boa
+import pytest
+from boa.contracts.abi.abi_contract import ABIContractFactory
+from boa.rpc import RPCError, to_bytes
+from boa.util.abi import Address, abi_encode
+
+ADDRESS = Address("0x" + "12" * 20)
+TOKEN_ABI = [
+    {
+        "type": "function",
+        "name": "balanceOf",
+        "stateMutability": "view",
+        "inputs": [{"name": "owner", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+    {
+        "type": "function",
+        "name": "transfer",
+        "stateMutability": "nonpayable",
+        "inputs": [
+            {"name": "to", "type": "address"},
+            {"name": "amount", "type": "uint256"},
+        ],
+        "outputs": [{"name": "", "type": "bool"}],
+    },
+]
+
+
+def test_state(mock_env, mock_node):
+    mock_env.set_state(code={ADDRESS: b"\x01" * 32}, balance={ADDRESS: 5})
+    assert mock_env.get_code(ADDRESS) == "0x" + "01" * 32
+    assert mock_env.get_balance(ADDRESS) == 5
+
+    with mock_env.anchor():
+        mock_env.set_balance(ADDRESS, 6)
+        mock_env.timestamp += 100
+        assert mock_env.get_balance(ADDRESS) == 6
+    assert mock_env.get_balance(ADDRESS) == 5
+    assert ("evm_revert", ["0x0"]) in mock_node.requests
+
+
+def test_calls_and_transactions(mock_env, mock_node):
+    mock_node.mock_call(ADDRESS, abi_encode("(uint256)", (42,)))
+    with boa.swap_env(mock_env):
+        token = ABIContractFactory.from_abi_dict(TOKEN_ABI).at(ADDRESS)
+        assert token.balanceOf(mock_env.eoa) == 42
+
+        mock_node.mock_call(
+            ADDRESS, abi_encode("(bool)", (True,)), token.transfer.method_id
+        )
+        assert token.transfer(ADDRESS, 1) is True
+        assert mock_env.last_receipt["status"] == "0x1"
+        assert mock_node.state.nonces[mock_env.eoa.lower()] == 1
+
+        mock_node.mock_call(ADDRESS, revert="not enough", data=token.transfer.method_id)
+        with pytest.raises(Exception, match="not enough"):
+            token.transfer(ADDRESS, 1)
+
+
+def test_deploy(mock_env, mock_node):
+    bytecode = b"\x01" * 32
+    address, _ = mock_env.deploy_code(bytecode=bytecode)
+    assert to_bytes(mock_env.get_code(address)) == bytecode
+    second, _ = mock_env.deploy_code(bytecode=bytecode)
+    assert second != address
+    assert mock_node.fetch("eth_getTransactionCount", [mock_env.eoa, "latest"]) == "0x2"
+
+
+def test_state_overrides_are_unsupported(mock_env, mock_node):
+    overrides = {ADDRESS: {"balance": "0x1"}}
+    with pytest.raises(RPCError, match="not supported"):
+        mock_node.fetch("eth_call", [{"to": ADDRESS}, "latest", overrides])
+    assert mock_env._rpc_has_state_override is False
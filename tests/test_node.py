@@ -0,0 +1,102 @@
+import socket
+import sys
+
+import pytest
+
+from boa_zksync import node as node_module
+from boa_zksync.node import AnvilZKsync, _start_node
+from boa_zksync.rpc import ZksyncRPC
+from boa_zksync.rpc_cache import CachingRPCProxy
+from boa_zksync.util import (
+    NodeExitedError,
+    find_free_port,
+    stop_subprocess,
+    wait_node,
+    wait_url,
+)
+
+# nothing listens on this port, so only the output can signal readiness
+URL = "http://localhost:9"
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_wait_node_reads_output():
+    process, ready = _start_node(
+        _python("import time; print('Listening on 0.0.0.0:9'); time.sleep(10)")
+    )
+    try:
+        wait_node(URL, process, ready, timeout=5)
+        assert ready.is_set()
+    finally:
+        stop_subprocess(process)
+
+
+def test_wait_node_exited():
+    process, ready = _start_node(_python("exit(3)"))
+    with pytest.raises(NodeExitedError, match="exited with code 3"):
+        wait_node(URL, process, ready, timeout=5)
+
+
+def test_wait_node_timeout():
+    process, ready = _start_node(_python("import time; time.sleep(10)"))
+    try:
+        with pytest.raises(TimeoutError):
+            wait_node(URL, process, ready, timeout=0.1)
+    finally:
+        stop_subprocess(process)
+
+
+def test_wait_url_is_deprecated():
+    with pytest.warns(DeprecationWarning, match="use wait_node"):
+        with pytest.raises(TimeoutError):
+            wait_url(URL, timeout=0.1)
+
+
+def test_find_free_port_is_reserved():
+    ports = [find_free_port() for _ in range(100)]
+    assert len(set(ports)) == len(ports)
+
+    # the port is not handed out again, but a server can bind it
+    with socket.socket() as server:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(("0.0.0.0", ports[0]))
+        server.listen(1)
+
+
+def test_failed_start_cleans_up(monkeypatch, tmp_path):
+    processes, proxies = [], []
+
+    def start_node(args, output):
+        process, ready = _start_node(_python("import time; time.sleep(10)"), output)
+        processes.append(process)
+        return process, ready
+
+    class Proxy(CachingRPCProxy):
+        def stop(self):
+            proxies.append(self)
+            super().stop()
+
+    def wait_node(*args):
+        raise TimeoutError("Timed out waiting for the node")
+
+    monkeypatch.setattr(node_module, "_start_node", start_node)
+    monkeypatch.setattr(node_module, "CachingRPCProxy", Proxy)
+    monkeypatch.setattr(node_module, "wait_node", wait_node)
+    # stopped when starting fails, not only when garbage collected
+    monkeypatch.setattr(AnvilZKsync, "__del__", lambda self: None)
+    with pytest.raises(TimeoutError):
+        AnvilZKsync(ZksyncRPC(URL), rpc_cache=tmp_path / "cache.sqlite3")
+
+    (process,) = processes
+    assert process.poll() is not None
+    assert len(proxies) == 1
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+def test_missing_binary(monkeypatch, tmp_path):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        AnvilZKsync()
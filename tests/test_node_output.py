@@ -0,0 +1,80 @@
+import logging
+from threading import Timer
+
+from boa_zksync.node_output import NodeOutput
+
+TX_HASH = "0x" + "ab" * 32
+
+# as printed by anvil-zksync with `--show-calls user`
+OUTPUT = f"""\
+\x1b[32mINFO\x1b[0m Executing {TX_HASH}
+┌─────────────────────────┐
+│   TRANSACTION SUMMARY   │
+└─────────────────────────┘
+Transaction: FAILED
+Gas Limit: 1_000_000 | Used: 123_456 | Refunded: 0
+├─ Call(Normal) 0x0000000000000000000000000000000000008001 transfer(...)
+│  └─ Call(Mimic) 0x1234567890123456789012345678901234567890 set(42)
+ERROR Revert reason: not allowed
+"""
+
+
+def _output(text: str, **kwargs) -> NodeOutput:
+    output = NodeOutput(**kwargs)
+    for line in text.splitlines(keepends=True):
+        output.add(line)
+    return output
+
+
+def test_parse_transaction():
+    tx = _output("Node is starting\n" + OUTPUT).get_tx(TX_HASH.upper())
+    assert tx.tx_hash == TX_HASH
+    assert tx.failed
+    assert (tx.gas_limit, tx.gas_used) == (1_000_000, 123_456)
+    assert tx.calls == [
+        "Call(Normal) 0x0000000000000000000000000000000000008001 transfer(...)",
+        "Call(Mimic) 0x1234567890123456789012345678901234567890 set(42)",
+    ]
+    assert tx.errors == ["ERROR Revert reason: not allowed"]
+    assert tx.lines[0] == f"INFO Executing {TX_HASH}"
+
+
+def test_buffers_are_bounded():
+    text = "".join(OUTPUT.replace("ab", f"{i:02x}") for i in range(5))
+    output = _output(text, max_lines=4, max_transactions=2, max_tx_lines=3)
+    assert output.tail(10) == list(output.lines) and len(output.lines) == 4
+    assert output.get_tx(TX_HASH.replace("ab", "02")) is None
+    assert output.get_tx(TX_HASH.replace("ab", "04")).gas_used == 123_456
+    assert len(output.get_tx(TX_HASH.replace("ab", "04")).lines) == 3
+
+
+def test_transaction_ends_after_summary():
+    text = (
+        OUTPUT + "INFO eth_call\n├─ Call(Normal) 0x1234 get()\nERROR Halt reason: x\n"
+    )
+    tx = _output(text).get_tx(TX_HASH)
+    assert len(tx.calls) == 2
+    assert tx.errors == ["ERROR Revert reason: not allowed"]
+    assert tx.lines[-1] == "ERROR Revert reason: not allowed"
+
+
+def test_calls_and_errors_are_bounded():
+    calls = "├─ Call(Normal) 0x1234 get()\nERROR Revert reason: no\n" * 10
+    tx = _output(OUTPUT + calls, max_tx_lines=3).get_tx(TX_HASH)
+    assert len(tx.calls) == len(tx.errors) == 3
+
+
+def test_logs_problems(caplog):
+    with caplog.at_level(logging.WARNING):
+        _output("WARN port in use\nINFO ready\nERROR failed to fork\n")
+    assert [(r.levelno, r.message) for r in caplog.records] == [
+        (logging.WARNING, "anvil-zksync: WARN port in use"),
+        (logging.ERROR, "anvil-zksync: ERROR failed to fork"),
+    ]
+
+
+def test_wait_for_transaction():
+    output = NodeOutput()
+    assert output.get_tx(TX_HASH) is None
+    Timer(0.05, output.add, [f"Executing {TX_HASH}\n"]).start()
+    assert output.get_tx(TX_HASH, timeout=5).tx_hash == TX_HASH
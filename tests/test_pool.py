@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import boa
+import pytest
+
+import boa_zksync
+from boa_zksync.node import node_config
+from boa_zksync.pool import NodePool
+
+
+@pytest.fixture
+def pool():
+    with NodePool(size=1) as pool:
+        yield pool
+
+
+def _wait_ready(pool, node_args=()):
+    for future in pool._nodes[node_config(None, None, node_args)]:
+        future.result()
+
+
+def test_acquire_ready_node(pool):
+    _wait_ready(pool)
+    node = pool.acquire()
+    assert pool.stats.hits == 1 and pool.stats.misses == 0
+    assert len(pool.stats.startup_times) == 1
+    assert node.fetch("eth_chainId", [])
+
+    # a replacement is started in the background
+    _wait_ready(pool)
+    assert len(pool.stats.startup_times) == 2
+    node.stop()
+
+
+def test_acquire_other_config(pool):
+    node = pool.acquire(node_args=("--show-calls", "user"))
+    assert pool.stats.misses == 1
+    assert node.node_args == ("--show-calls", "user")
+    pool.release(node)
+
+
+def test_release_resets_node(pool):
+    _wait_ready(pool)
+    node = pool.acquire()
+    block_number = node.fetch("eth_blockNumber", [])
+    node.fetch("evm_mine", [])
+    assert node.fetch("eth_blockNumber", []) != block_number
+
+    # the node replaces the one that was started in the background
+    pool.release(node)
+    assert pool.acquire() is node
+    assert pool.stats.hits == 2
+    assert node.fetch("eth_blockNumber", []) == block_number
+    pool.release(node)
+
+
+def test_node_context(pool):
+    with pool.node() as node:
+        pass
+    with pool.node() as other:
+        assert other is node
+
+
+def test_set_zksync_test_env_with_pool(pool):
+    _wait_ready(pool)
+    with boa.swap_env(boa.env):
+        boa_zksync.set_zksync_test_env(pool=pool)
+        assert pool.stats.hits == 1
+        assert boa.env._rpc.pool_snapshot is not None
+        pool.release(boa.env._rpc)
+
+
+def test_failed_background_start_is_retried(monkeypatch):
+    starts = []
+
+    def start(self, inner_rpc, block_identifier, node_args):
+        starts.append(node_args)
+        if len(starts) == 1:
+            raise RuntimeError("port in use")
+        return SimpleNamespace(stop=lambda: None)
+
+    monkeypatch.setattr(NodePool, "_start", start)
+    with NodePool(size=1) as pool:
+        (future,) = pool._nodes[node_config(None, None, ())]
+        assert isinstance(future.exception(), RuntimeError)
+        # the failed node is not a hit, and the caller gets a new node
+        assert pool.acquire() is not None
+        assert (pool.stats.hits, pool.stats.misses) == (0, 1)
+        assert len(starts) >= 2
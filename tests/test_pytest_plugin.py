@@ -0,0 +1,97 @@
+pytest_plugins = ["pytester"]
+
+_TESTS = """
+import boa
+import pytest
+
+from boa_zksync.environment import ZksyncEnv
+from boa_zksync.mock_node import MockZksyncNode
+
+ADDRESS = "0x" + "01" * 20
+
+
+@pytest.fixture(scope="module")
+def shared_env():
+    env = ZksyncEnv(MockZksyncNode())
+    with boa.swap_env(env):
+        env.set_balance(ADDRESS, 1)  # e.g. an expensive deployment
+        yield env
+
+
+def test_change(shared_env):
+    shared_env.set_balance(ADDRESS, 2)
+    assert shared_env.get_balance(ADDRESS) == 2
+
+
+def test_reverted(shared_env):
+    assert shared_env.get_balance(ADDRESS) == 1
+    assert shared_env._rpc.methods[-2:] == ["evm_revert", "eth_getBalance"]
+
+
+@pytest.mark.ignore_isolation
+def test_change_kept(shared_env):
+    shared_env.set_balance(ADDRESS, 3)
+
+
+def test_kept(shared_env):
+    assert shared_env.get_balance(ADDRESS) == 3
+"""
+
+
+def test_tests_are_isolated(pytester):
+    pytester.makepyfile(_TESTS)
+    # without boa's own plugin, so only the zkSync anchors are used
+    result = pytester.runpytest("-p", "no:boa_test")
+    result.assert_outcomes(passed=4)
+
+
+def test_nested_in_boa_plugin(pytester):
+    pytester.makepyfile(_TESTS)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=4)
+
+
+_SHARED_STATE_TESTS = """
+import boa
+import pytest
+
+from boa_zksync.contract import ContractABI, ZksyncContract
+from boa_zksync.environment import ZksyncEnv
+from boa_zksync.mock_node import MockZksyncNode
+from boa_zksync.types import ZksyncCompilerData
+
+ADDRESS = "0x" + "01" * 20
+DATA = ZksyncCompilerData("Empty", "", "v1.5.10", [], bytes(32), {}, [], "", [], [])
+
+
+@pytest.fixture(scope="session")
+def token(zksync_shared_state):
+    env = ZksyncEnv(MockZksyncNode())
+
+    def setup():
+        with open(SETUPS, "a") as f:
+            f.write("setup\\n")
+        env.set_balance(ADDRESS, 42)
+        contract = ZksyncContract.attach(
+            DATA, "Empty", ContractABI("Empty", []), ADDRESS, env
+        )
+        contract._ensure_registered()
+        return {"token": contract}
+
+    with boa.swap_env(env):
+        yield zksync_shared_state("token", setup)["token"]
+
+
+@pytest.mark.parametrize("i", range(4))
+def test_shared(token, i):
+    assert token.address == ADDRESS
+    assert boa.env.get_balance(ADDRESS) == 42
+"""
+
+
+def test_shared_state_between_workers(pytester):
+    setups = pytester.path / "setups.txt"
+    pytester.makepyfile(_SHARED_STATE_TESTS.replace("SETUPS", repr(str(setups))))
+    result = pytester.runpytest("-n", "2")
+    result.assert_outcomes(passed=4)
+    assert setups.read_text() == "setup\n"
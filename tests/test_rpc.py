@@ -0,0 +1,92 @@
+import os
+import resource
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+import requests
+
+from boa_zksync.rpc import KeepAliveTransport, _is_dropped
+from boa_zksync.util import find_free_port
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open
+
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.connections += 1
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        status = 500 if body == b"fail" else 200
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # close without telling the client, like a server dropping idle connections
+        self.close_connection = body == b"drop"
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("localhost", 0), _Handler)
+    server.connections = 0
+    Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport(server):
+    transport = KeepAliveTransport(f"http://localhost:{server.server_port}")
+    yield transport
+    transport.close()
+
+
+def test_reuses_connection(server, transport):
+    for i in range(10):
+        assert transport.post(b"%d" % i) == b"%d" % i
+    assert server.connections == 1
+
+
+def test_reconnects_when_dropped(server, transport):
+    assert transport.post(b"drop") == b"drop"
+    assert transport.post(b"1") == b"1"
+    assert server.connections == 2
+
+
+def test_errors(server, transport):
+    with pytest.raises(requests.HTTPError, match="500"):
+        transport.post(b"fail")
+    closed = KeepAliveTransport(f"http://localhost:{find_free_port()}")
+    with pytest.raises(requests.ConnectionError):
+        closed.post(b"1")
+
+
+def test_connections_are_bounded(server, transport):
+    # every call of e.g. `prefetch` runs in new threads
+    for _ in range(5):
+        with ThreadPoolExecutor(transport.max_idle) as executor:
+            results = list(executor.map(transport.post, [b"1"] * 50))
+        assert results == [b"1"] * 50
+    assert server.connections <= transport.max_idle
+    assert len(transport._idle) <= transport.max_idle
+
+
+def test_is_dropped_with_high_file_descriptors(server):
+    if resource.getrlimit(resource.RLIMIT_NOFILE)[0] <= 2000:
+        pytest.skip("not enough file descriptors")
+    with socket.create_connection(("localhost", server.server_port)) as connection:
+        sock = socket.socket(fileno=os.dup2(connection.fileno(), 2000))
+        try:
+            assert not _is_dropped(sock)
+        finally:
+            sock.close()
@@ -0,0 +1,127 @@
+import pytest
+import requests
+
+from boa_zksync.rpc_cache import CachingRPCProxy
+
+UPSTREAM_URL = "http://upstream.invalid"
+
+
+@pytest.fixture
+def upstream():
+    """Records the forwarded payloads, and answers every request with its method."""
+    payloads = []
+
+    def forward(payload):
+        payloads.append(payload)
+        if isinstance(payload, list):
+            return [_answer(request) for request in payload]
+        return _answer(payload)
+
+    return forward, payloads
+
+
+def _answer(request):
+    return {"jsonrpc": "2.0", "id": request["id"], "result": request["method"]}
+
+
+def _request(method, *params, id=1):
+    return {"jsonrpc": "2.0", "id": id, "method": method, "params": list(params)}
+
+
+def _proxy(tmp_path, upstream, url=UPSTREAM_URL):
+    proxy = CachingRPCProxy(url, tmp_path / "cache.sqlite3")
+    proxy._forward, _ = upstream
+    return proxy
+
+
+def test_pinned_requests_are_cached(tmp_path, upstream):
+    _, payloads = upstream
+    request = _request("eth_getCode", "0x1234", "0x10")
+    proxy = _proxy(tmp_path, upstream)
+    assert proxy.handle(request)["result"] == "eth_getCode"
+    proxy.stop()
+
+    # the cache is on disk, so a new proxy answers from it
+    proxy = _proxy(tmp_path, upstream)
+    response = proxy.handle({**request, "id": 7})
+    assert response == {"jsonrpc": "2.0", "id": 7, "result": "eth_getCode"}
+    assert len(payloads) == 1
+    assert (proxy.hits, proxy.misses) == (1, 0)
+    proxy.stop()
+
+
+def test_mutable_requests_are_forwarded(tmp_path, upstream):
+    _, payloads = upstream
+    proxy = _proxy(tmp_path, upstream)
+    for _ in range(2):
+        proxy.handle(_request("eth_getCode", "0x1234", "latest"))
+        proxy.handle(_request("eth_blockNumber"))
+    assert len(payloads) == 4
+    assert (proxy.hits, proxy.misses) == (0, 4)
+    proxy.stop()
+
+
+def test_batch(tmp_path, upstream):
+    _, payloads = upstream
+    proxy = _proxy(tmp_path, upstream)
+    proxy.handle(_request("eth_getStorageAt", "0x1234", "0x0", "0x10"))
+    batch = [
+        _request("eth_getStorageAt", "0x1234", "0x0", "0x10", id=1),
+        _request("eth_blockNumber", id=2),
+    ]
+    assert proxy.handle(batch) == [
+        {"jsonrpc": "2.0", "id": 1, "result": "eth_getStorageAt"},
+        {"jsonrpc": "2.0", "id": 2, "result": "eth_blockNumber"},
+    ]
+    # only the missing request is forwarded
+    assert payloads[-1] == [batch[1]]
+    proxy.stop()
+
+
+def test_upstreams_are_kept_apart(tmp_path, upstream):
+    _, payloads = upstream
+    request = _request("eth_chainId")
+    for url in (UPSTREAM_URL, "http://other.invalid"):
+        proxy = _proxy(tmp_path, upstream, url)
+        proxy.handle(request)
+        proxy.stop()
+    assert len(payloads) == 2
+
+
+def test_serves_http(tmp_path, upstream):
+    proxy = _proxy(tmp_path, upstream)
+    response = requests.post(proxy.url, json=_request("eth_chainId"))
+    assert response.json() == {"jsonrpc": "2.0", "id": 1, "result": "eth_chainId"}
+    proxy.stop()
+
+
+def test_pending_transactions_are_not_cached(tmp_path):
+    pending = {"hash": "0x1", "blockNumber": None}
+    mined = {"hash": "0x1", "blockNumber": "0x10"}
+    transactions = [None, pending, mined]
+    payloads = []
+
+    def forward(payload):
+        payloads.append(payload)
+        return {"jsonrpc": "2.0", "id": 1, "result": transactions[len(payloads) - 1]}
+
+    proxy = _proxy(tmp_path, (forward, payloads))
+    request = _request("eth_getTransactionByHash", "0x1")
+    results = [proxy.handle(request)["result"] for _ in range(4)]
+    assert results == [None, pending, mined, mined]
+    assert len(payloads) == 3  # only the mined transaction is cached
+    proxy.stop()
+
+
+def test_malformed_bodies(tmp_path, upstream):
+    proxy = _proxy(tmp_path, upstream)
+    response = requests.post(proxy.url, data=b"{not json")
+    assert response.json()["error"]["code"] == -32700
+
+    def forward(payload):
+        raise ValueError("upstream returned HTML")
+
+    proxy._forward = forward
+    response = requests.post(proxy.url, json=_request("eth_chainId"))
+    assert response.status_code == 502
+    proxy.stop()
@@ -0,0 +1,41 @@
+import pytest
+
+from boa_zksync.environment import _RPCState
+
+ADDRESS = "0x" + "00" * 20
+
+
+def test_cached_state(mock_node):
+    mock_node.state.timestamp, mock_node.state.block_number = 100, 5
+    mock_node.state.balances[ADDRESS] = 16
+    state = _RPCState(mock_node, cache=True)
+    assert state.timestamp == 101
+    assert state.block_number == 6
+    assert state.base_fee == mock_node.gas_price
+    assert state.get_balance(ADDRESS) == 16
+    assert state.get_balance(ADDRESS) == 16
+    assert mock_node.methods == ["eth_getBlockByNumber", "eth_getBalance"]
+    assert (state.hits, state.misses) == (3, 2)
+
+    state.timestamp = 200  # invalidates the cache
+    assert state.timestamp == 200
+    assert mock_node.methods[-2:] == ["evm_setTime", "eth_getBlockByNumber"]
+
+
+def test_uncached_state(mock_node):
+    state = _RPCState(mock_node)
+    assert state.timestamp == state.timestamp
+    assert mock_node.methods == ["eth_getBlockByNumber", "eth_getBlockByNumber"]
+    assert (state.hits, state.misses) == (0, 2)
+
+
+def test_reverted_transaction_invalidates(mock_env, mock_node):
+    mock_env.vm.state.cache = True
+    to = "0x" + "12" * 20
+    mock_node.mock_call(to, revert="no")
+    block_number = mock_env.vm.state.block_number
+
+    # with a gas limit, the transaction is mined without estimating the gas
+    with pytest.raises(Exception, match="txn failed"):
+        mock_env.execute_code(to, gas=100_000, is_modifying=True)
+    assert mock_env.vm.state.block_number == block_number + 1
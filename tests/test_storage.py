@@ -0,0 +1,75 @@
+import boa
+import pytest
+from vyper.compiler.output import build_layout_output
+
+from boa_zksync.storage import get_slot, get_storage_slot, is_readable, read_storage
+
+CODE = """
+struct Point:
+    x: int128
+    y: address
+
+bar: uint256
+map: HashMap[address, HashMap[String[10], int128]]
+list: uint256[2]
+point: Point
+name: String[40]
+data: DynArray[uint256, 5]
+nested: DynArray[String[5], 2]
+enabled: public(bool)
+
+@deploy
+def __init__():
+    self.bar = 123
+    self.map[msg.sender]["key"] = -5
+    self.list = [1, 2]
+    self.point = Point(x=-1, y=msg.sender)
+    self.name = "a string that spans two storage slots"
+    self.name = "short"
+    self.data = [7, 8, 9]
+    self.enabled = True
+"""
+
+
+@pytest.fixture(scope="module")
+def pyevm_contract():
+    # read the storage of a contract in the local py-evm, to check the slots
+    with boa.swap_env(boa.Env()):
+        yield boa.loads(CODE)
+
+
+def _read(contract, name, *keys):
+    layout = build_layout_output(contract.compiler_data)
+    var = contract.compiler_data.global_ctx.variables[name]
+    slot, typ = get_slot(get_storage_slot(layout, name), var.typ, list(keys))
+
+    def read_words(start, count):
+        return b"".join(
+            contract.env.get_storage(contract.address, start + i).to_bytes(32, "big")
+            for i in range(count)
+        )
+
+    return read_storage(read_words, slot, typ)
+
+
+def test_read_storage(pyevm_contract):
+    assert _read(pyevm_contract, "bar") == 123
+    assert _read(pyevm_contract, "map", pyevm_contract.env.eoa, "key") == -5
+    assert _read(pyevm_contract, "map", pyevm_contract.env.eoa, "other") == 0
+    assert _read(pyevm_contract, "list") == [1, 2]
+    assert _read(pyevm_contract, "point") == (-1, pyevm_contract.env.eoa)
+    assert _read(pyevm_contract, "name") == "short"
+    assert _read(pyevm_contract, "data") == [7, 8, 9]
+    assert _read(pyevm_contract, "enabled") is True
+
+
+def test_is_readable(pyevm_contract):
+    variables = pyevm_contract.compiler_data.global_ctx.variables
+    assert is_readable(variables["map"].typ)
+    assert is_readable(variables["data"].typ)
+    assert not is_readable(variables["nested"].typ)
+
+
+def test_get_storage_slot_missing():
+    assert get_storage_slot(None, "bar") is None
+    assert get_storage_slot({"storage_layout": {}}, "bar") is None
@@ -0,0 +1,105 @@
+import json
+from datetime import timedelta
+from threading import Event, Lock
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from boa_zksync import verifiers
+from boa_zksync.verifiers import ZksyncExplorer
+
+SOLC_JSON = {
+    "sources": {"Token.vy": {"content": "# token"}},
+    "compiler_version": "0.4.0+commit.e9db8d9",
+    "zkvyper_version": "1.5.10",
+}
+
+
+class ExplorerSession:
+    """Answers like the explorer. Each contract is verified after `polls` status requests."""
+
+    def __init__(self, polls: dict[str, int], delay=0.0):
+        self.polls = polls  # by address, -1 fails the verification
+        self.delay = delay  # the seconds each submission takes
+        self.ids: dict[str, str] = {}
+        self.requests = []
+        self._lock = Lock()
+
+    def post(self, url, data, headers):
+        address = json.loads(data)["contractAddress"]
+        Event().wait(self.delay)  # not time.sleep, which the tests record
+        with self._lock:
+            self.requests.append(("post", address))
+            self.ids[str(len(self.ids) + 1)] = address
+            return _response(200, str(len(self.ids)))
+
+    def get(self, url):
+        verification_id = url.rsplit("/", 1)[1]
+        with self._lock:
+            self.requests.append(("get", verification_id))
+            address = self.ids[verification_id]
+            self.polls[address] -= 1
+            if self.polls[address] < -1:
+                return _response(200, '{"status": "failed", "error": "mismatch"}')
+            if self.polls[address] > 0:
+                return _response(200, '{"status": "in_progress"}')
+            return _response(200, '{"status": "successful"}')
+
+
+def _response(status_code, content):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content.encode()
+    return response
+
+
+def _contract(address):
+    return SimpleNamespace(
+        address=address,
+        contract_name="Token",
+        constructor_calldata=b"",
+        deployer=SimpleNamespace(solc_json=SOLC_JSON),
+    )
+
+
+def test_verify_many():
+    explorer = ZksyncExplorer(backoff=timedelta(milliseconds=10))
+    explorer.session = ExplorerSession({"0x1": 3, "0x2": 1, "0x3": -1})
+    contracts = [_contract(address) for address in ("0x1", "0x2", "0x3")]
+
+    results = list(explorer.verify_many(contracts))
+
+    # in the order they finished
+    assert results[-1].contract.address == "0x1"
+    by_address = {result.contract.address: result for result in results}
+    assert {address: r.verified for address, r in by_address.items()} == {
+        "0x1": True,
+        "0x2": True,
+        "0x3": False,
+    }
+    with pytest.raises(ValueError, match="mismatch"):
+        raise by_address["0x3"].error
+    # every pending verification is polled in each round
+    assert explorer.session.requests.count(("get", results[2].verification_id)) == 3
+
+
+def test_verify_many_timeout():
+    explorer = ZksyncExplorer(timeout=timedelta(0))
+    explorer.session = ExplorerSession({"0x1": 10})
+
+    (result,) = explorer.verify_many([_contract("0x1")])
+    assert result.verification_id == "1"
+    assert isinstance(result.error, TimeoutError)
+
+
+def test_verify_many_backoff_starts_when_pending(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(verifiers.time, "sleep", sleeps.append)
+    explorer = ZksyncExplorer(backoff=timedelta(milliseconds=10))
+    # the slow submission is waited for, instead of sleeping with a growing backoff
+    explorer.session = ExplorerSession({"0x1": 1, "0x2": 2}, delay=0.05)
+
+    results = list(explorer.verify_many([_contract("0x1"), _contract("0x2")]))
+    assert all(result.verified for result in results)
+    assert sleeps == [0.01]